@@ -1,4 +1,6 @@
-import copy
+import numpy as np
+
+import rules
 
 
 class AIPlayer:
@@ -18,7 +20,7 @@ class AIPlayer:
         Evaluates the board state using a heuristic function.
         """
         empty_spaces = sum(row.count(0) for row in board)
-        return -(empty_spaces) + (lines_cleared * 10) + (diamonds_obtained * 10)
+        return -(empty_spaces) + rules.move_score(lines_cleared, diamonds_obtained)
 
     def get_best_move(self):
         """
@@ -32,59 +34,61 @@ class AIPlayer:
     def greedy_search(self):
         """
         Implements Greedy Best-First Search to select the best move.
+        All legal placements of the next piece are scored at once by evaluate_moves().
         """
-        best_move = None
-        best_score = float('-inf')
-
         piece_name, piece = self.game_controller.piece_sequence.peek_next_piece()
 
-        for r in range(self.game_controller.game_board.rows - len(piece) + 1):
-            for c in range(self.game_controller.game_board.cols - len(piece[0]) + 1):
-                if self.game_controller.can_place_piece(piece, r, c):
+        placements = rules.legal_placements(self.game_controller.bitboard, piece)
+        if not placements:
+            return None
 
-                    # Simulate placing the piece
-                    simulated_board = copy.deepcopy(self.game_controller.game_board.board)
-                    for pr in range(len(piece)):
-                        for pc in range(len(piece[0])):
-                            if piece[pr][pc] == 1:
-                                simulated_board[r + pr][c + pc] = 1
+        scores = self.evaluate_moves(self.game_controller.game_board.board, piece, placements)
+        best = placements[int(np.argmax(scores))]  # First best placement in row-major order
+        return best.row, best.col
 
-                    # Check cleared lines and diamonds
-                    lines_cleared, diamonds_obtained = self.evaluate_move(simulated_board)
+    def evaluate_moves(self, board, piece, placements):
+        """
+        Scores many candidate placements of one piece with vectorized NumPy reductions.
 
-                    # Compute heuristic score
-                    score = self.heuristic(simulated_board, diamonds_obtained, lines_cleared)
+        Every candidate board is built into one (K, rows, cols) array, then lines cleared, diamonds obtained
+        and empty cells left are computed for all of them at once and combined as in heuristic().
 
-                    # Update best move
-                    if score > best_score:
-                        best_score = score
-                        best_move = (r, c)
+        Args:
+            board (list): The current board as a list of lists.
+            piece (list): The piece shape as a list of lists.
+            placements (list): Legal Placement entries (row, col, ...) for the piece.
 
-        return best_move
+        Returns:
+            numpy.ndarray: The heuristic score of each placement, in the same order.
+        """
+        piece_array = np.array(piece, dtype=np.int8)
+        piece_rows, piece_cols = piece_array.shape
+        anchor_rows = np.array([p.row for p in placements])
+        anchor_cols = np.array([p.col for p in placements])
+
+        # Stack one copy of the board per candidate and stamp the piece into each copy
+        candidates = np.repeat(np.array(board, dtype=np.int8)[np.newaxis], len(placements), axis=0)
+        k = np.arange(len(placements))[:, np.newaxis, np.newaxis]
+        rr = anchor_rows[:, np.newaxis, np.newaxis] + np.arange(piece_rows)[np.newaxis, :, np.newaxis]
+        cc = anchor_cols[:, np.newaxis, np.newaxis] + np.arange(piece_cols)[np.newaxis, np.newaxis, :]
+        candidates[k, rr, cc] += piece_array  # Legal placements never overlap filled cells
+
+        filled = candidates != 0
+        full_rows = filled.all(axis=2)
+        full_cols = filled.all(axis=1)
+        cleared = full_rows[:, :, np.newaxis] | full_cols[:, np.newaxis, :]
+
+        lines_cleared = full_rows.sum(axis=1) + full_cols.sum(axis=1)
+        diamonds_obtained = ((candidates == 2) & cleared).sum(axis=(1, 2))
+        empty_spaces = (~filled | cleared).sum(axis=(1, 2))
+        return -empty_spaces + rules.move_score(lines_cleared, diamonds_obtained)
 
     def evaluate_move(self, board):
         """
         Evaluates the result of placing a piece by checking cleared lines and diamonds.
+        Completed lines are cleared from the board, all at once as in the game.
         """
-        lines_cleared = 0
-        diamonds_obtained = 0
-
-        # Check rows
-        for r in range(len(board)):
-            if all(cell in [1, 2] for cell in board[r]):
-                lines_cleared += 1
-                diamonds_obtained += board[r].count(2)
-                board[r] = [0] * len(board[r])
-
-        # Check columns
-        for c in range(len(board[0])):
-            if all(board[r][c] in [1, 2] for r in range(len(board))):
-                lines_cleared += 1
-                diamonds_obtained += sum(1 for r in range(len(board)) if board[r][c] == 2)
-                for r in range(len(board)):
-                    board[r][c] = 0
-
-        return lines_cleared, diamonds_obtained
+        return rules.clear_grid_lines(board)
 
     def play_step(self):
         """
@@ -0,0 +1,8 @@
+"""
+Benchmarks for the game kernels and the search algorithms.
+
+Run them from the project root with `python -m benchmarks`; see benchmarks/__main__.py for the options.
+"""
+from benchmarks.baseline import compare_timings, compare_to_baseline, load_baseline, save_baseline
+from benchmarks.kernels import benchmark_kernels
+from benchmarks.searches import benchmark_searches
@@ -0,0 +1,61 @@
+import argparse
+import sys
+
+from benchmarks import (benchmark_kernels, benchmark_searches, compare_timings, compare_to_baseline, load_baseline,
+                        save_baseline)
+from benchmarks.searches import SEARCH_ALGORITHMS
+from presets import DIFFICULTY_PRESETS
+
+
+def main(argv=None):
+    """Runs the benchmarks, prints them, and optionally saves or checks a baseline."""
+    parser = argparse.ArgumentParser(description="Benchmark the game kernels and search algorithms.")
+    parser.add_argument("--presets", nargs="+", choices=list(DIFFICULTY_PRESETS), default=list(DIFFICULTY_PRESETS),
+                        help="Difficulty presets to benchmark.")
+    parser.add_argument("--algorithms", nargs="+", choices=list(SEARCH_ALGORITHMS),
+                        help="Search algorithms to benchmark (default: all).")
+    parser.add_argument("--seeds", nargs="+", type=int, default=[0], help="Board seeds.")
+    parser.add_argument("--node-limit", type=int, default=20000,
+                        help="Node expansions allowed per search, which keeps the searches deterministic.")
+    parser.add_argument("--time-limit", type=float, help="Seconds allowed per search, on top of the node limit.")
+    parser.add_argument("--repeat", type=int, default=2000, help="Calls per timed batch of each kernel.")
+    parser.add_argument("--runs", type=int, default=5,
+                        help="Timed batches per kernel and timed runs per search; the fastest is reported.")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the peak memory runs.")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Save the results as a baseline JSON file.")
+    parser.add_argument("--compare", metavar="PATH", help="Compare the results with a saved baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Relative change allowed before a metric counts as a regression.")
+    args = parser.parse_args(argv)
+
+    presets = {name: DIFFICULTY_PRESETS[name] for name in args.presets}
+    results = {"kernels": {}, "searches": {}}
+    for preset_name, game_params in presets.items():
+        for kernel, metrics in benchmark_kernels(game_params, args.seeds[0], args.repeat, args.runs).items():
+            results["kernels"][f"{preset_name}/{kernel}"] = metrics
+    results["searches"] = benchmark_searches(presets, args.algorithms, tuple(args.seeds), args.node_limit,
+                                             args.time_limit, not args.no_memory, args.runs)
+
+    for section, benchmarks in results.items():
+        print(f"[{section}]")
+        for name, metrics in benchmarks.items():
+            print(f"  {name:45s} " + "  ".join(f"{metric}={value}" for metric, value in metrics.items()))
+
+    if args.save_baseline:
+        save_baseline(results, args.save_baseline)
+        print(f"Baseline saved to {args.save_baseline}")
+    if args.compare:
+        baseline = load_baseline(args.compare)
+        for name, metric, old, new in compare_timings(results, baseline, args.tolerance):
+            print(f"SLOWER {name} {metric}: {old} -> {new} (timing, not gated)")
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        for name, metric, old, new in regressions:
+            print(f"REGRESSION {name} {metric}: {old} -> {new}")
+        if regressions:
+            return 1
+        print("No regressions.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,102 @@
+import json
+
+# Metric -> True if a larger value is better. These are deterministic (searches are bounded by nodes, not time),
+# so any change beyond the tolerance is a real one and fails the comparison.
+METRIC_DIRECTIONS = {
+    "nodes_expanded": False,
+    "score": True,
+    "complete": True,
+}
+
+# Timing metric -> True if a larger value is better. Timings drift between runs on the same code, so changes are
+# only reported, never gated.
+TIMING_DIRECTIONS = {
+    "mean_us": False,
+    "calls_per_sec": True,
+    "wall_time": False,
+    "nodes_per_sec": True,
+    "peak_memory_kb": False,
+}
+
+# Metrics that say nothing about the code once a search stopped at its limit, in case a time limit stopped it
+LIMITED_METRICS = ("score",)
+
+NOISE_FLOOR = 0.1 # Seconds; the timings of searches faster than this are dominated by noise and not reported
+
+
+def save_baseline(results, path):
+    """Writes benchmark results to a JSON file so later runs can be compared against them."""
+    with open(path, "w") as baseline_file:
+        json.dump(results, baseline_file, indent=2, sort_keys=True)
+
+
+def load_baseline(path):
+    """Reads benchmark results written by save_baseline()."""
+    with open(path) as baseline_file:
+        return json.load(baseline_file)
+
+
+def _worse(old, new, higher_is_better, tolerance):
+    """Checks whether new is worse than old by more than `tolerance`, a fraction of old."""
+    if higher_is_better:
+        return new < old * (1 - tolerance)
+    return new > old * (1 + tolerance)
+
+
+def _compared_metrics(results, baseline, directions):
+    """Yields (benchmark, metrics, baseline metrics, metric, higher_is_better) for every metric in both runs."""
+    for section, benchmarks in results.items():
+        for name, metrics in benchmarks.items():
+            baseline_metrics = baseline.get(section, {}).get(name)
+            if baseline_metrics is None:
+                continue
+            for metric, higher_is_better in directions.items():
+                if metric in metrics and metric in baseline_metrics:
+                    yield f"{section}/{name}", metrics, baseline_metrics, metric, higher_is_better
+
+
+def compare_to_baseline(results, baseline, tolerance=0.2):
+    """
+    Compares the deterministic metrics (METRIC_DIRECTIONS) of results with a baseline.
+
+    A metric regresses when it is worse than the baseline by more than `tolerance` (a fraction of the baseline
+    value). Only benchmarks and metrics present in both are compared, and the LIMITED_METRICS of a search that
+    hit its limit (in either run) are skipped.
+
+    Args:
+        results (dict): Benchmark results, section -> benchmark name -> metrics.
+        baseline (dict): Results loaded with load_baseline().
+        tolerance (float): Allowed relative change.
+
+    Returns:
+        list: (benchmark, metric, baseline value, new value) for each regression.
+    """
+    regressions = []
+    for name, metrics, baseline_metrics, metric, higher_is_better in _compared_metrics(
+            results, baseline, METRIC_DIRECTIONS):
+        if metric in LIMITED_METRICS and (metrics.get("limit_hit") or baseline_metrics.get("limit_hit")):
+            continue
+        old, new = baseline_metrics[metric], metrics[metric]
+        if _worse(old, new, higher_is_better, tolerance):
+            regressions.append((name, metric, old, new))
+    return regressions
+
+
+def compare_timings(results, baseline, tolerance=0.2, noise_floor=NOISE_FLOOR):
+    """
+    Compares the timing metrics (TIMING_DIRECTIONS) of results with a baseline, for reporting only.
+
+    Searches whose wall_time is under noise_floor in either run are left out.
+
+    Returns:
+        list: (benchmark, metric, baseline value, new value) for each timing worse by more than `tolerance`.
+    """
+    slowdowns = []
+    for name, metrics, baseline_metrics, metric, higher_is_better in _compared_metrics(
+            results, baseline, TIMING_DIRECTIONS):
+        if min(metrics.get("wall_time", noise_floor), baseline_metrics.get("wall_time", noise_floor)) < noise_floor:
+            continue
+        old, new = baseline_metrics[metric], metrics[metric]
+        if _worse(old, new, higher_is_better, tolerance):
+            slowdowns.append((name, metric, old, new))
+    return slowdowns
@@ -0,0 +1,82 @@
+import copy
+import timeit
+
+from bitboard import piece_masks
+from game_state import GameState
+from simulation import create_game
+
+
+def _time_calls(function, make_arguments, runs=5):
+    """
+    Times function(*args) over a batch of argument tuples: one warm-up batch, then `runs` timed batches.
+
+    Args:
+        function (callable): The kernel.
+        make_arguments (callable): Builds a fresh batch of argument tuples; every batch is built before the
+            clock starts, since some kernels mutate their input.
+        runs (int): Timed batches.
+
+    Returns:
+        float: Mean time per call in microseconds, from the fastest batch. Slower batches were slowed down by
+        the rest of the machine, not by the kernel.
+    """
+    batches = [make_arguments() for _ in range(runs + 1)]
+    calls = len(batches[0])
+
+    def run_batch():
+        for args in batches.pop():
+            function(*args)
+
+    times = timeit.repeat(run_batch, repeat=runs + 1, number=1)
+    return min(times[1:]) / calls * 1e6 # The first batch warms the caches up
+
+
+def benchmark_kernels(game_params, seed=0, repeat=2000, runs=5):
+    """
+    Times the per-node kernels on a fixed-seed board.
+
+    Args:
+        game_params (dict): rows, cols, fill_density and sequence_length of the board.
+        seed (int): Seed of the board and sequence.
+        repeat (int): Calls per timed batch of each kernel.
+        runs (int): Timed batches per kernel; the fastest one is reported.
+
+    Returns:
+        dict: kernel name -> {"mean_us": microseconds per call, "calls_per_sec": calls per second}.
+    """
+    game_controller = create_game(game_params, seed)
+    state = GameState(game_controller.game_board, game_controller.piece_sequence.sequence,
+                      game_controller.bitboard.copy())
+    piece_name, piece = state.next_piece()
+    actions = state.get_possible_actions(piece) or [(0, 0)]
+    moves = [actions[i % len(actions)] for i in range(repeat)]
+
+    # Kernels that mutate their input get a fresh copy per call
+    occupancy, diamonds = piece_masks(piece, state.bitboard.cols)
+
+    def filled_bitboards():
+        bitboards = []
+        for row, col in moves:
+            bitboard = state.bitboard.copy()
+            shift = row * bitboard.cols + col
+            bitboard.place(occupancy << shift, diamonds << shift)
+            bitboards.append((bitboard,))
+        return bitboards
+
+    def controllers():
+        return [(copy.deepcopy(game_controller), row, col) for row, col in moves]
+
+    def piece_moves():
+        return [(piece, row, col) for row, col in moves]
+
+    timings = {
+        "can_place_piece": _time_calls(state.can_place_piece, piece_moves, runs),
+        "get_possible_actions": _time_calls(state.get_possible_actions, lambda: [(piece,)] * repeat, runs),
+        "generate_successor_with_score": _time_calls(state.generate_successor_with_score, piece_moves, runs),
+        "clear_lines_score": _time_calls(state.clear_lines_score, filled_bitboards, runs),
+        "place_piece": _time_calls(lambda controller, row, col: controller.place_piece(piece, row, col),
+                                   controllers, runs),
+    }
+    return {name: {"mean_us": round(mean_us, 3), "calls_per_sec": round(1e6 / mean_us, 1)}
+            for name, mean_us in timings.items()}
+
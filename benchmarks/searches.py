@@ -0,0 +1,85 @@
+import tracemalloc
+
+from game_state import GameState
+from search_algorithms import (AStarSearch, BeamSearch, BreadthFirstSearch, DFSearch, MonteCarloTreeSearch,
+                               UniformCostSearch)
+from simulation import create_game
+
+# Algorithm name -> factory taking the per-search node and time limits
+SEARCH_ALGORITHMS = {
+    "bfs": lambda node_limit, time_limit: BreadthFirstSearch(node_limit=node_limit, time_limit=time_limit),
+    "dfs": lambda node_limit, time_limit: DFSearch(node_limit=node_limit, time_limit=time_limit),
+    "dfs_bnb": lambda node_limit, time_limit: DFSearch(branch_and_bound=True, node_limit=node_limit,
+                                                       time_limit=time_limit),
+    "astar": lambda node_limit, time_limit: AStarSearch(node_limit=node_limit, time_limit=time_limit),
+    "ucs": lambda node_limit, time_limit: UniformCostSearch(node_limit=node_limit, time_limit=time_limit),
+    "beam": lambda node_limit, time_limit: BeamSearch(node_limit=node_limit, time_limit=time_limit),
+    "mcts": lambda node_limit, time_limit: MonteCarloTreeSearch(seed=0, node_limit=node_limit, time_limit=time_limit),
+}
+
+
+def benchmark_search(algorithm_name, game_params, seed=0, node_limit=20000, time_limit=None, measure_memory=True,
+                     runs=5):
+    """
+    Runs full searches on a fixed-seed board and keeps the fastest.
+
+    The search is bounded by node_limit rather than by time, so it does the same work on every run and every
+    machine; time_limit is only a safety net. The timed runs and the memory run are separate, since tracemalloc
+    slows the search down.
+
+    Args:
+        runs (int): Timed runs of the search; wall_time is the fastest one, as for the kernels.
+
+    Returns:
+        dict: wall_time, nodes_expanded, nodes_per_sec, score, complete, limit_hit (the search stopped at its
+        node or time limit) and (optionally) peak_memory_kb.
+    """
+    game_controller = create_game(game_params, seed)
+    state = GameState(game_controller.game_board, game_controller.piece_sequence.sequence,
+                      game_controller.bitboard.copy())
+
+    results = [SEARCH_ALGORITHMS[algorithm_name](node_limit, time_limit).run(state) for _ in range(max(1, runs))]
+    result = min(results, key=lambda run: run.stats.elapsed_time)
+    stats = result.stats
+    measurement = {
+        "wall_time": round(stats.elapsed_time, 4),
+        "nodes_expanded": stats.nodes_expanded,
+        "nodes_per_sec": round(stats.nodes_expanded / stats.elapsed_time, 1) if stats.elapsed_time else 0.0,
+        "score": result.score if result.score is not None else 0,
+        "complete": result.complete,
+        "limit_hit": stats.budget_exhausted,
+    }
+
+    if measure_memory:
+        tracemalloc.start()
+        SEARCH_ALGORITHMS[algorithm_name](node_limit, time_limit).run(state)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        measurement["peak_memory_kb"] = round(peak / 1024, 1)
+    return measurement
+
+
+def benchmark_searches(presets, algorithms=None, seeds=(0,), node_limit=20000, time_limit=None,
+                       measure_memory=True, runs=5):
+    """
+    Benchmarks every algorithm on every preset and seed.
+
+    Args:
+        presets (dict): Preset name -> game parameters, e.g. DIFFICULTY_PRESETS.
+        algorithms (list, optional): Names from SEARCH_ALGORITHMS. Defaults to all of them.
+        seeds (tuple): Board seeds.
+        node_limit (int): Node expansions allowed per search, so exhaustive searches stay bounded on hard boards.
+        time_limit (float, optional): Time limit of each search, on top of node_limit.
+        measure_memory (bool): Also measure the peak traced memory of each search.
+        runs (int): Timed runs of each search.
+
+    Returns:
+        dict: "preset/algorithm/seed" -> measurement from benchmark_search().
+    """
+    results = {}
+    for preset_name, game_params in presets.items():
+        for algorithm_name in algorithms or SEARCH_ALGORITHMS:
+            for seed in seeds:
+                results[f"{preset_name}/{algorithm_name}/{seed}"] = benchmark_search(
+                    algorithm_name, game_params, seed, node_limit, time_limit, measure_memory, runs)
+    return results
@@ -0,0 +1,220 @@
+from functools import lru_cache
+
+from piece import Piece
+
+
+@lru_cache(maxsize=None)
+def line_masks(rows, cols):
+    """
+    Returns the bit masks of every row and every column for a board of the given size.
+
+    Cell (r, c) is stored at bit r * cols + c, so a row is a contiguous run of bits and
+    a column is every cols-th bit.
+
+    Args:
+        rows (int): The number of rows on the board.
+        cols (int): The number of columns on the board.
+
+    Returns:
+        tuple: (row_masks, col_masks), two tuples of ints.
+    """
+    row_mask = (1 << cols) - 1
+    row_masks = tuple(row_mask << (r * cols) for r in range(rows))
+    col_mask = sum(1 << (r * cols) for r in range(rows))
+    col_masks = tuple(col_mask << c for c in range(cols))
+    return row_masks, col_masks
+
+
+@lru_cache(maxsize=None)
+def touched_lines(rows, cols, row, col, height, width):
+    """
+    Returns the masks of the rows and columns covered by a height x width piece anchored at (row, col).
+
+    A placement can only complete lines it touches, so these are the only lines worth checking after it.
+    """
+    row_masks, col_masks = line_masks(rows, cols)
+    return row_masks[row:row + height] + col_masks[col:col + width]
+
+
+def piece_masks(piece, cols):
+    """
+    Converts a piece shape into bit masks anchored at the top-left cell of a board with `cols` columns.
+
+    Any non-zero cell of the piece occupies the board; cells with value 2 also carry a diamond.
+    Shifting both masks left by (row * cols + col) moves the piece to anchor (row, col).
+
+    Args:
+        piece (list): The piece shape as a list of lists (0 = empty, 1 = block, 2 = diamond).
+        cols (int): The number of columns on the board.
+
+    Returns:
+        tuple: (occupancy_mask, diamond_mask).
+    """
+    if type(piece) is Piece:
+        return piece.masks(cols)
+    occupancy = 0
+    diamonds = 0
+    for r, piece_row in enumerate(piece):
+        for c, cell in enumerate(piece_row):
+            if cell:
+                bit = 1 << (r * cols + c)
+                occupancy |= bit
+                if cell == 2:
+                    diamonds |= bit
+    return occupancy, diamonds
+
+
+class BitBoard:
+    """
+    Integer bitmask representation of a board: one mask for filled cells (blocks and diamonds)
+    and one mask for the diamond cells, which is always a subset of the filled mask.
+    """
+    __slots__ = ("rows", "cols", "filled", "diamonds")
+
+    def __init__(self, rows, cols, filled=0, diamonds=0):
+        """
+        Initializes the bitboard.
+
+        Args:
+            rows (int): The number of rows on the board.
+            cols (int): The number of columns on the board.
+            filled (int): Mask of the occupied cells.
+            diamonds (int): Mask of the cells holding a diamond.
+        """
+        self.rows = rows
+        self.cols = cols
+        self.filled = filled
+        self.diamonds = diamonds
+
+    @classmethod
+    def from_grid(cls, grid):
+        """
+        Builds a bitboard from a list-of-lists board (0 = empty, 1 = block, 2 = diamond).
+        """
+        rows = len(grid)
+        cols = len(grid[0]) if rows else 0
+        filled, diamonds = piece_masks(grid, cols)
+        return cls(rows, cols, filled, diamonds)
+
+    def to_grid(self):
+        """
+        Expands the bitboard back into a list-of-lists board.
+        """
+        grid = []
+        for r in range(self.rows):
+            row = []
+            for c in range(self.cols):
+                bit = 1 << (r * self.cols + c)
+                if self.diamonds & bit:
+                    row.append(2)
+                elif self.filled & bit:
+                    row.append(1)
+                else:
+                    row.append(0)
+            grid.append(row)
+        return grid
+
+    def copy(self):
+        """Returns an independent copy of the bitboard."""
+        return BitBoard(self.rows, self.cols, self.filled, self.diamonds)
+
+    def key(self):
+        """Returns a hashable key identifying the board contents."""
+        return self.filled, self.diamonds
+
+    def fits(self, piece, row, col):
+        """
+        Checks whether the piece lies inside the board when anchored at (row, col).
+        """
+        return (row >= 0 and col >= 0 and
+                row + len(piece) <= self.rows and col + len(piece[0]) <= self.cols)
+
+    def can_place(self, occupancy_mask):
+        """
+        Checks that none of the cells in the (already shifted) occupancy mask are filled.
+        """
+        return not (self.filled & occupancy_mask)
+
+    def place(self, occupancy_mask, diamond_mask=0):
+        """
+        Stamps an (already shifted) piece onto the board without clearing lines.
+        """
+        self.filled |= occupancy_mask
+        self.diamonds |= diamond_mask
+
+    def full_lines(self, lines=None):
+        """
+        Finds the completed rows and columns.
+
+        Args:
+            lines (tuple, optional): Line masks to check, e.g. from touched_lines(). Defaults to every
+                row and column of the board.
+
+        Returns:
+            tuple: (cleared_mask, lines) where cleared_mask is the union of the full lines
+            and lines is how many rows and columns are full.
+        """
+        if lines is None:
+            row_masks, col_masks = line_masks(self.rows, self.cols)
+            lines = row_masks + col_masks
+        filled = self.filled
+        cleared = 0
+        count = 0
+        for mask in lines:
+            if filled & mask == mask:
+                cleared |= mask
+                count += 1
+        return cleared, count
+
+    def clear_lines(self, lines=None):
+        """
+        Clears all completed rows and columns at once.
+
+        Rows and columns are detected on the board as it is before anything is cleared,
+        so a cell where a full row crosses a full column is cleared (and scored) once.
+
+        Args:
+            lines (tuple, optional): Line masks to check; see full_lines().
+
+        Returns:
+            tuple: (lines_cleared, diamonds_cleared).
+        """
+        cleared, lines = self.full_lines(lines)
+        if not cleared:
+            return 0, 0
+        diamonds_cleared = (self.diamonds & cleared).bit_count()
+        self.filled &= ~cleared
+        self.diamonds &= ~cleared
+        return lines, diamonds_cleared
+
+    def apply(self, occupancy_mask, diamond_mask=0, lines=None):
+        """
+        Stamps an (already shifted) piece and clears the lines it completes, in place.
+
+        Args:
+            occupancy_mask (int): Cells covered by the piece.
+            diamond_mask (int): Cells of the piece holding a diamond.
+            lines (tuple, optional): Lines the piece touches (see touched_lines()); only those can complete.
+
+        Returns:
+            tuple: (cleared_mask, cleared_diamonds, lines) - everything undo() needs to restore the board.
+        """
+        self.filled |= occupancy_mask
+        self.diamonds |= diamond_mask
+        cleared, lines = self.full_lines(lines)
+        cleared_diamonds = self.diamonds & cleared
+        if cleared:
+            self.filled &= ~cleared
+            self.diamonds &= ~cleared
+        return cleared, cleared_diamonds, lines
+
+    def undo(self, occupancy_mask, diamond_mask, cleared_mask, cleared_diamonds):
+        """
+        Reverts apply(): refills the cleared lines and lifts the piece back off the board.
+        """
+        self.filled = (self.filled | cleared_mask) & ~occupancy_mask
+        self.diamonds = (self.diamonds | cleared_diamonds) & ~diamond_mask
+
+    def count_empty(self):
+        """Returns the number of empty cells."""
+        return self.rows * self.cols - self.filled.bit_count()
@@ -0,0 +1,136 @@
+import tkinter as tk
+
+LABEL_FONT = ("Arial", 14)
+CELL_OUTLINE = "black"
+
+
+class BoardCanvas:
+    """
+    A grid of cells drawn once on a single tk.Canvas.
+
+    Every cell is a rectangle item created up front. set_color() only talks to Tk when a cell's color actually
+    changes, so redrawing after a move costs one item update per changed cell however big the grid is.
+    A color of None hides the cell (used by the next piece preview for cells outside the piece).
+    """
+
+    def __init__(self, parent, rows, cols, cell_size=40, show_labels=True, on_click=None, on_enter=None,
+                 on_leave=None):
+        """
+        Creates the canvas and its cell items.
+
+        Args:
+            parent (tk.Widget): The widget holding the canvas.
+            rows (int): The number of rows of the grid.
+            cols (int): The number of columns of the grid.
+            cell_size (int): Initial size of a cell in pixels; the cells are rescaled when the canvas is resized.
+            show_labels (bool): Draw row and column numbers along the top and left edges.
+            on_click (callable, optional): f(row, col) called when a cell is clicked.
+            on_enter (callable, optional): f(row, col) called when the pointer moves onto a cell.
+            on_leave (callable, optional): f(row, col) called when the pointer leaves a cell.
+        """
+        self.rows = rows
+        self.cols = cols
+        self.cell_size = cell_size
+        self.offset = 1 if show_labels else 0 # Cells taken by the row and column numbers
+        self.on_click = on_click
+        self.on_enter = on_enter
+        self.on_leave = on_leave
+        self.canvas = tk.Canvas(parent, width=(cols + self.offset) * cell_size,
+                                height=(rows + self.offset) * cell_size, highlightthickness=0)
+
+        self._cells = {} # (row, col) -> rectangle item id
+        self._colors = {} # (row, col) -> color currently shown
+        self._labels = [] # (item id, row, col) of the row and column numbers, -1 marking the label axis
+        self._hovered = None # Cell under the pointer
+        for r in range(rows):
+            for c in range(cols):
+                self._cells[(r, c)] = self.canvas.create_rectangle(0, 0, 0, 0, fill="white", outline=CELL_OUTLINE)
+                self._colors[(r, c)] = "white"
+        if show_labels:
+            for c in range(cols):
+                self._labels.append((self.canvas.create_text(0, 0, text=str(c), font=LABEL_FONT), -1, c))
+            for r in range(rows):
+                self._labels.append((self.canvas.create_text(0, 0, text=str(r), font=LABEL_FONT), r, -1))
+        self._layout()
+
+        self.canvas.bind("<Configure>", self._on_configure)
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.canvas.bind("<Motion>", self._on_motion)
+        self.canvas.bind("<Leave>", self._on_pointer_leave)
+
+    def pack(self, **kwargs):
+        """Packs the canvas into its parent."""
+        self.canvas.pack(**kwargs)
+
+    def set_color(self, row, col, color):
+        """Shows the cell in the given color (None hides it); does nothing if it already shows that color."""
+        current = self._colors[(row, col)]
+        if current == color:
+            return
+        item = self._cells[(row, col)]
+        if color is None:
+            self.canvas.itemconfigure(item, state=tk.HIDDEN)
+        elif current is None:
+            self.canvas.itemconfigure(item, state=tk.NORMAL, fill=color)
+        else:
+            self.canvas.itemconfigure(item, fill=color)
+        self._colors[(row, col)] = color
+
+    def get_color(self, row, col):
+        """Returns the color the cell currently shows."""
+        return self._colors[(row, col)]
+
+    def draw(self, colors):
+        """
+        Shows a full grid of colors, updating only the cells that changed.
+
+        Args:
+            colors (list): rows lists of cols colors (None hides a cell).
+        """
+        for r, color_row in enumerate(colors):
+            for c, color in enumerate(color_row):
+                self.set_color(r, c, color)
+
+    def cell_at(self, x, y):
+        """Returns the (row, col) of the cell at canvas coordinates (x, y), or None outside the grid."""
+        row = int(y // self.cell_size) - self.offset
+        col = int(x // self.cell_size) - self.offset
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return row, col
+        return None
+
+    def _layout(self):
+        """Moves every item to match the current cell size; only runs when the canvas is resized."""
+        size = self.cell_size
+        for (r, c), item in self._cells.items():
+            x = (c + self.offset) * size
+            y = (r + self.offset) * size
+            self.canvas.coords(item, x + 1, y + 1, x + size - 1, y + size - 1)
+        for item, r, c in self._labels:
+            self.canvas.coords(item, (c + self.offset + 0.5) * size, (r + self.offset + 0.5) * size)
+
+    def _on_configure(self, event):
+        """Rescales the grid to fill the canvas."""
+        cell_size = max(1, min(event.width // (self.cols + self.offset), event.height // (self.rows + self.offset)))
+        if cell_size != self.cell_size:
+            self.cell_size = cell_size
+            self._layout()
+
+    def _on_click(self, event):
+        cell = self.cell_at(event.x, event.y)
+        if cell is not None and self.on_click is not None:
+            self.on_click(*cell)
+
+    def _on_motion(self, event):
+        cell = self.cell_at(event.x, event.y)
+        if cell == self._hovered:
+            return
+        self._on_pointer_leave(event)
+        self._hovered = cell
+        if cell is not None and self.on_enter is not None:
+            self.on_enter(*cell)
+
+    def _on_pointer_leave(self, event):
+        if self._hovered is not None and self.on_leave is not None:
+            self.on_leave(*self._hovered)
+        self._hovered = None
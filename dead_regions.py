@@ -0,0 +1,190 @@
+from functools import lru_cache
+
+from bitboard import line_masks
+from piece import piece_definitions
+from placement_index import get_placement_index
+
+MAX_CACHED_REGIONS = 1 << 16
+
+
+def flood_fill(seed, empty, cols, not_first_col, not_last_col, max_cells=None):
+    """
+    Grows the 4-connected region of empty cells around the seed cells with bitmask shifts.
+
+    Each step grows the region by one cell in every direction with four shifts, so a region costs a few
+    integer operations per step of its diameter instead of a visit per cell.
+
+    Args:
+        seed (int): Mask of the starting cells, all empty.
+        empty (int): Mask of the empty cells.
+        cols (int): The number of columns on the board.
+        not_first_col (int): Board mask without the first column, which stops shifts wrapping across rows.
+        not_last_col (int): Board mask without the last column.
+        max_cells (int, optional): Stop as soon as the region holds more cells than this.
+
+    Returns:
+        int: Mask of the region, or of the part grown so far if it outgrew max_cells.
+    """
+    region = seed
+    while True:
+        grown = (region | ((region << 1) & not_first_col) | ((region >> 1) & not_last_col) |
+                 (region << cols) | (region >> cols)) & empty
+        if grown == region or (max_cells is not None and grown.bit_count() > max_cells):
+            return grown
+        region = grown
+
+
+def empty_regions(bitboard):
+    """
+    Splits the empty cells of the board into 4-connected regions.
+
+    Returns:
+        list: The mask of every empty region.
+    """
+    rows, cols = bitboard.rows, bitboard.cols
+    _, col_masks = line_masks(rows, cols)
+    board_mask = (1 << (rows * cols)) - 1
+    not_first_col = board_mask & ~col_masks[0]
+    not_last_col = board_mask & ~col_masks[-1]
+    empty = board_mask & ~bitboard.filled
+    regions = []
+    while empty:
+        region = flood_fill(empty & -empty, empty, cols, not_first_col, not_last_col) # From the lowest empty cell
+        regions.append(region)
+        empty &= ~region
+    return regions
+
+
+class DeadRegionAnalyzer:
+    """
+    Finds the dead pockets of a board for one piece sequence: empty regions smaller than the smallest piece
+    still to place, or that none of the remaining shapes fits into.
+
+    A pocket stays dead until a line clear opens it up, so a line crossing one cannot complete on its own.
+    Once no row or column can complete any more the board only fills up, and a shape that fits nowhere now
+    will never fit: is_doomed() uses this to recognise positions that can never reach the goal.
+    """
+
+    def __init__(self, pieces, rows, cols, max_checked_region=8):
+        """
+        Args:
+            pieces (sequence): The (piece_name, shape) pairs to place, in order.
+            rows (int): The number of rows on the board.
+            cols (int): The number of columns on the board.
+            max_checked_region (int): Regions of up to this many cells are checked shape by shape; larger ones
+                are taken to fit a piece, which keeps the analysis cheap and never calls a live region dead.
+        """
+        self.rows = rows
+        self.cols = cols
+        self.max_checked_region = max_checked_region
+        self.placement_index = get_placement_index(rows, cols)
+        row_masks, col_masks = line_masks(rows, cols)
+        self._lines = row_masks + col_masks
+        self._board_mask = (1 << (rows * cols)) - 1
+        self._not_first_col = self._board_mask & ~col_masks[0]
+        self._not_last_col = self._board_mask & ~col_masks[-1]
+        # For each depth d, over pieces[d:]: the placements of each distinct shape, the smallest piece size
+        # and the number of cells still to place
+        self.shapes = [()] * (len(pieces) + 1)
+        self.min_cells = [0] * (len(pieces) + 1)
+        self.cells_needed = [0] * (len(pieces) + 1)
+        seen = set()
+        for depth in range(len(pieces) - 1, -1, -1):
+            placements = self.placement_index.placements(pieces[depth][1])
+            size = placements[0].occupancy.bit_count() if placements else 0
+            key = tuple(p.occupancy for p in placements) # Pieces differing only in diamonds share a shape
+            self.shapes[depth] = self.shapes[depth + 1] if key in seen else self.shapes[depth + 1] + (placements,)
+            seen.add(key)
+            self.min_cells[depth] = min(size, self.min_cells[depth + 1]) if depth + 1 < len(pieces) else size
+            self.cells_needed[depth] = self.cells_needed[depth + 1] + size
+        self._fits = {} # (region, depth) -> whether a shape of pieces[depth:] fits inside the region
+
+    def dead_cells(self, bitboard, depth=0):
+        """Returns the mask of the empty cells in regions that no piece of pieces[depth:] fits into."""
+        dead = 0
+        for region in empty_regions(bitboard):
+            if not self._region_fits(region, depth):
+                dead |= region
+        return dead
+
+    def is_doomed(self, bitboard, depth):
+        """
+        Checks whether the pieces from depth on can no longer all be placed.
+
+        When no line can complete (see live_lines()), the position is doomed as soon as one remaining shape fits
+        nowhere on the board. True is always right; False means the analysis cannot rule the goal out.
+        """
+        if depth >= len(self.shapes) - 1:
+            return False
+        if self.live_lines(bitboard, depth, first_only=True):
+            return False
+        filled = bitboard.filled
+        return any(all(filled & p.occupancy for p in placements) for placements in self.shapes[depth])
+
+    def live_lines(self, bitboard, depth, first_only=False):
+        """
+        Returns the masks of the rows and columns that could be the next line to complete.
+
+        Such a line misses no more cells than pieces[depth:] hold, and none of its empty cells is dead: until
+        the first clear the board only fills up, so a dead cell stays empty until then.
+
+        Only the regions crossing such a line are flood filled, and a fill stops as soon as the region is too
+        big to be dead, so a typical position costs a few shifts.
+
+        Args:
+            first_only (bool): Stop at the first line found.
+        """
+        if depth >= len(self.shapes) - 1:
+            return []
+        empty = self._board_mask & ~bitboard.filled
+        cells_needed = self.cells_needed[depth]
+        live = 0 # Empty cells known to lie in a live region
+        dead = 0 # Empty cells known to lie in a dead region
+        lines = []
+        for mask in self._lines:
+            unknown = mask & empty
+            if unknown.bit_count() > cells_needed or unknown & dead:
+                continue
+            unknown &= ~live
+            while unknown:
+                region = flood_fill(unknown & -unknown, empty, self.cols, self._not_first_col, self._not_last_col,
+                                    self.max_checked_region)
+                if self._region_fits(region, depth):
+                    live |= region
+                    unknown &= ~region
+                else:
+                    dead |= region
+                    break
+            if not unknown:
+                lines.append(mask)
+                if first_only:
+                    break
+        return lines
+
+    def _region_fits(self, region, depth):
+        """Checks whether any shape of pieces[depth:] fits entirely inside the region."""
+        size = region.bit_count()
+        if size < self.min_cells[depth]:
+            return False
+        if size > self.max_checked_region:
+            return True
+        key = (region, depth)
+        fits = self._fits.get(key)
+        if fits is None:
+            outside = ~region
+            fits = any(not p.occupancy & outside for placements in self.shapes[depth] for p in placements)
+            if len(self._fits) >= MAX_CACHED_REGIONS:
+                self._fits.clear()
+            self._fits[key] = fits
+        return fits
+
+
+@lru_cache(maxsize=None)
+def _definitions_analyzer(rows, cols):
+    """Returns the analyzer over every shape of piece_definitions for a board size."""
+    return DeadRegionAnalyzer(list(piece_definitions.items()), rows, cols)
+
+
+def dead_cells(bitboard):
+    """Counts the empty cells in regions that no shape of piece_definitions fits into."""
+    return _definitions_analyzer(bitboard.rows, bitboard.cols).dead_cells(bitboard).bit_count()
@@ -0,0 +1,299 @@
+import random
+
+import numpy as np
+
+import rules
+from piece import piece_definitions
+from presets import DIFFICULTY_PRESETS
+from simulation import create_game
+
+# Reset/step environments for training and evaluating learned policies, following the Gymnasium API
+# (reset() -> (observation, info), step() -> (observation, reward, terminated, truncated, info)) without
+# depending on it. An action is the anchor cell row * cols + col of the next piece; the observation's
+# action_mask marks the legal ones.
+
+PIECE_NAMES = tuple(piece_definitions) # Piece index used in observations -> piece type
+PIECE_SIZE = max(max(len(shape), len(shape[0])) for shape in piece_definitions.values()) # Side of a piece grid
+
+
+def piece_grid(piece):
+    """Returns the piece as a PIECE_SIZE x PIECE_SIZE int8 array anchored top-left (0 = empty, 1 = block, 2 = diamond)."""
+    grid = np.zeros((PIECE_SIZE, PIECE_SIZE), dtype=np.int8)
+    if piece is not None:
+        grid[:len(piece), :len(piece[0])] = piece
+    return grid
+
+
+def _create_game(game_params, seed):
+    """
+    Builds the game simulation.create_game() builds for the seed, then restores the global random and
+    np.random states it reseeds, so resetting an environment leaves the caller's random streams alone.
+    """
+    random_state, np_random_state = random.getstate(), np.random.get_state()
+    try:
+        return create_game(game_params, seed)
+    finally:
+        random.setstate(random_state)
+        np.random.set_state(np_random_state)
+
+
+class PuzzleEnv:
+    """
+    One game behind a reset/step interface, played by a GameController on a GameBoard and a PieceSequence.
+
+    Observations are dicts of NumPy arrays: "board" (rows x cols, 0 = empty, 1 = block, 2 = diamond),
+    "piece" (the next piece, see piece_grid()), "pieces_left" and "action_mask" (rows * cols booleans).
+    The reward of a step is the points it scored; an episode terminates on victory or when the next piece
+    fits nowhere.
+    """
+
+    def __init__(self, game_params=None, seed=None):
+        """
+        Args:
+            game_params (dict, optional): rows, cols, fill_density and sequence_length, as in DIFFICULTY_PRESETS.
+                Defaults to the Intermediate preset.
+            seed (int, optional): Seed of the games; each reset() without a seed plays the next game.
+        """
+        self.game_params = dict(game_params if game_params is not None else DIFFICULTY_PRESETS["Intermediate"])
+        self.rows = self.game_params["rows"]
+        self.cols = self.game_params["cols"]
+        self.num_actions = self.rows * self.cols
+        self._rng = random.Random(seed)
+        self.game_controller = None
+
+    def reset(self, seed=None, options=None):
+        """
+        Starts a new game. Games whose first piece fits nowhere are skipped.
+
+        Args:
+            seed (int, optional): Seed of this game, as in simulation.create_game(); reseeds the following games.
+            options (dict, optional): Unused, accepted for API compatibility.
+
+        Returns:
+            tuple: (observation, info).
+        """
+        if seed is not None:
+            self._rng = random.Random(seed)
+        self.game_controller = _create_game(self.game_params, self._rng.randrange(2 ** 32))
+        while self.game_controller.is_game_over() is not None: # The first piece fits nowhere: draw again
+            self.game_controller = _create_game(self.game_params, self._rng.randrange(2 ** 32))
+        return self._observation(), self._info()
+
+    def step(self, action):
+        """
+        Places the next piece with its top-left cell at action = row * cols + col.
+
+        Returns:
+            tuple: (observation, reward, terminated, truncated, info).
+
+        Raises:
+            ValueError: If the game is over or the action is not legal; see the observation's action_mask.
+        """
+        game_controller = self.game_controller
+        if game_controller is None or game_controller.is_game_over() is not None:
+            raise ValueError("step() called on a finished game; call reset() first")
+        row, col = divmod(int(action), self.cols)
+        score = game_controller.score
+        if game_controller.play(row, col) is None:
+            raise ValueError(f"Illegal action {action}: the piece does not fit at ({row}, {col})")
+        terminated = game_controller.is_game_over() is not None
+        return self._observation(), game_controller.score - score, terminated, False, self._info()
+
+    def action_mask(self):
+        """Returns the rows * cols booleans marking the anchors where the next piece can be placed."""
+        mask = np.zeros(self.num_actions, dtype=bool)
+        next_piece = self.game_controller.piece_sequence.peek_next_piece()
+        if next_piece is not None:
+            for placement in rules.legal_placements(self.game_controller.bitboard, next_piece[1]):
+                mask[placement.row * self.cols + placement.col] = True
+        return mask
+
+    def _observation(self):
+        next_piece = self.game_controller.piece_sequence.peek_next_piece()
+        return {
+            "board": np.array(self.game_controller.game_board.board, dtype=np.int8),
+            "piece": piece_grid(next_piece[1] if next_piece is not None else None),
+            "pieces_left": len(self.game_controller.piece_sequence.sequence),
+            "action_mask": self.action_mask(),
+        }
+
+    def _info(self):
+        return {"score": self.game_controller.score, "outcome": self.game_controller.is_game_over()}
+
+
+def random_boards(rng, count, rows, cols, fill_density, symmetric=True, edge_clear=True, diamond_rate=20):
+    """
+    Draws `count` starting boards at once, with the same distribution as GameBoard.initialize_board_state().
+
+    Args:
+        rng (numpy.random.Generator): Source of randomness.
+
+    Returns:
+        tuple: (filled, diamonds), two (count, rows, cols) boolean arrays.
+    """
+    noise = rng.random((count, rows, cols))
+    if symmetric:
+        noise = (noise + noise[:, :, ::-1]) / 2.0 # Each cell averaged with its mirror across the vertical axis
+    filled = noise < fill_density
+    if edge_clear:
+        filled[:, [0, -1], :] = False
+        filled[:, :, [0, -1]] = False
+    diamonds = np.zeros_like(filled)
+    diamonds[:, 1:-1, 1:-1] = filled[:, 1:-1, 1:-1] & (rng.integers(0, 100, (count, rows - 2, cols - 2)) < diamond_rate)
+    return filled, diamonds
+
+
+class VectorPuzzleEnv:
+    """
+    num_envs independent games stepped in lockstep on stacked NumPy arrays, for collecting rollouts fast.
+
+    Every game has the board size and sequence length of game_params. Boards, pieces, legal-action masks,
+    rewards and done flags are computed for all games at once with array operations; no Python object exists
+    per game. Games that end are reset automatically in the same step: the returned observation is already the
+    first of the new game, while info["score"] and info["victory"] describe the game that just ended.
+    Observations have the keys of PuzzleEnv's, with a leading num_envs axis, plus "piece_index"
+    (index in PIECE_NAMES).
+    """
+
+    def __init__(self, num_envs, game_params=None, seed=None, diamond_probability=0.1):
+        """
+        Args:
+            num_envs (int): Number of games.
+            game_params (dict, optional): rows, cols, fill_density and sequence_length, as in DIFFICULTY_PRESETS.
+                Defaults to the Intermediate preset.
+            seed (int, optional): Seed of the random generator drawing boards and pieces.
+            diamond_probability (float): Probability of each cell of a piece holding a diamond, as in PieceSequence.
+        """
+        self.num_envs = num_envs
+        self.game_params = dict(game_params if game_params is not None else DIFFICULTY_PRESETS["Intermediate"])
+        self.rows = self.game_params["rows"]
+        self.cols = self.game_params["cols"]
+        self.sequence_length = self.game_params["sequence_length"]
+        self.num_actions = self.rows * self.cols
+        self.diamond_probability = diamond_probability
+        self._rng = np.random.default_rng(seed)
+        self._shapes = np.stack([piece_grid(shape) for shape in piece_definitions.values()]).astype(bool)
+
+        n, rows, cols, length = num_envs, self.rows, self.cols, self.sequence_length
+        self.filled = np.zeros((n, rows, cols), dtype=bool)
+        self.diamonds = np.zeros((n, rows, cols), dtype=bool)
+        self.pieces = np.zeros((n, length), dtype=np.int16) # Piece index of every slot of every sequence
+        self.piece_diamonds = np.zeros((n, length, PIECE_SIZE, PIECE_SIZE), dtype=bool)
+        self.cursor = np.zeros(n, dtype=np.int32) # Slot of the next piece
+        self.score = np.zeros(n, dtype=np.int64)
+        self._masks = np.zeros((n, self.num_actions), dtype=bool)
+        self._envs = np.arange(n)
+
+    def reset(self, seed=None, options=None):
+        """
+        Starts a new game in every environment.
+
+        Returns:
+            tuple: (observations, info).
+        """
+        if seed is not None:
+            self._rng = np.random.default_rng(seed)
+        self._reset_envs(self._envs)
+        return self._observations(), {}
+
+    def step(self, actions):
+        """
+        Places the next piece of every game at its action (row * cols + col).
+
+        Returns:
+            tuple: (observations, rewards, terminated, truncated, info), the last four as arrays over the games.
+
+        Raises:
+            ValueError: If an action is not legal; see the observations' action_mask.
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        envs = self._envs
+        illegal = ~self._masks[envs, actions]
+        if illegal.any():
+            raise ValueError(f"Illegal actions in environments {np.flatnonzero(illegal).tolist()}")
+
+        # Stamp each next piece onto its board, on a margin wide enough for anchors near the edges
+        size = PIECE_SIZE
+        slot = self.cursor
+        occupancy = self._shapes[self.pieces[envs, slot]]
+        piece_diamonds = self.piece_diamonds[envs, slot]
+        rows = (actions // self.cols)[:, None, None] + np.arange(size)[None, :, None]
+        cols = (actions % self.cols)[:, None, None] + np.arange(size)[None, None, :]
+        k = envs[:, None, None]
+        placed = np.zeros((self.num_envs, self.rows + size - 1, self.cols + size - 1), dtype=bool)
+        placed[k, rows, cols] = occupancy
+        self.filled |= placed[:, :self.rows, :self.cols]
+        placed[k, rows, cols] = piece_diamonds
+        self.diamonds |= placed[:, :self.rows, :self.cols]
+
+        # Every full row and column is found first, then all are cleared together
+        full_rows = self.filled.all(axis=2)
+        full_cols = self.filled.all(axis=1)
+        cleared = full_rows[:, :, None] | full_cols[:, None, :]
+        lines = full_rows.sum(axis=1) + full_cols.sum(axis=1)
+        diamonds = (self.diamonds & cleared).sum(axis=(1, 2))
+        rewards = lines * rules.LINE_POINTS + diamonds * rules.DIAMOND_POINTS
+        self.filled &= ~cleared
+        self.diamonds &= ~cleared
+        self.score += rewards
+        self.cursor += 1
+
+        victory = self.cursor >= self.sequence_length
+        self._update_masks()
+        terminated = victory | ~self._masks.any(axis=1)
+        info = {"score": self.score.copy(), "victory": victory}
+        done = np.flatnonzero(terminated)
+        if len(done):
+            self._reset_envs(done)
+        return self._observations(), rewards, terminated, np.zeros(self.num_envs, dtype=bool), info
+
+    def action_masks(self):
+        """Returns the (num_envs, rows * cols) legal-action masks of the next pieces."""
+        return self._masks.copy()
+
+    def _reset_envs(self, envs):
+        """Draws new boards and piece sequences for the given environments, again until each first piece fits."""
+        count = len(envs)
+        params = self.game_params
+        self.filled[envs], self.diamonds[envs] = random_boards(self._rng, count, self.rows, self.cols,
+                                                               params["fill_density"])
+        pieces = self._rng.integers(0, len(PIECE_NAMES), (count, self.sequence_length))
+        self.pieces[envs] = pieces
+        self.piece_diamonds[envs] = self._shapes[pieces] & (
+            self._rng.random((count, self.sequence_length, PIECE_SIZE, PIECE_SIZE)) < self.diamond_probability)
+        self.cursor[envs] = 0
+        self.score[envs] = 0
+        self._update_masks(envs)
+        stuck = envs[~self._masks[envs].any(axis=1)]
+        if len(stuck):
+            self._reset_envs(stuck)
+
+    def _update_masks(self, envs=None):
+        """
+        Recomputes the legal-action masks of the given environments (default: all).
+
+        The board is padded with blocked cells, so a piece cell hanging off the edge counts as an overlap,
+        and every anchor is tested at once through a sliding window over the padded board.
+        """
+        if envs is None:
+            envs = self._envs
+        size = PIECE_SIZE
+        slot = np.minimum(self.cursor[envs], self.sequence_length - 1)
+        occupancy = self._shapes[self.pieces[envs, slot]]
+        padded = np.ones((len(envs), self.rows + size - 1, self.cols + size - 1), dtype=bool)
+        padded[:, :self.rows, :self.cols] = self.filled[envs]
+        windows = np.lib.stride_tricks.sliding_window_view(padded, (size, size), axis=(1, 2))
+        overlap = (windows & occupancy[:, None, None]).any(axis=(3, 4))
+        self._masks[envs] = ~overlap.reshape(len(envs), -1)
+
+    def _observations(self):
+        envs = self._envs
+        slot = np.minimum(self.cursor, self.sequence_length - 1)
+        piece_index = self.pieces[envs, slot]
+        return {
+            "board": self.filled.astype(np.int8) + self.diamonds,
+            "piece": self._shapes[piece_index].astype(np.int8) + self.piece_diamonds[envs, slot],
+            "piece_index": piece_index,
+            "pieces_left": self.sequence_length - self.cursor,
+            "action_mask": self._masks.copy(),
+        }
@@ -1,5 +1,7 @@
-import copy
+import rules
+from bitboard import BitBoard
 from game_state import GameState
+from solution_cache import find_plan
 
 
 class GameController:
@@ -7,110 +9,81 @@ class GameController:
     Manages the game logic, including piece placement, board updates, and game state checks.
     """
 
-    def __init__(self, game_board, piece_sequence, search_algorithm):
+    def __init__(self, game_board, piece_sequence, search_algorithm, solution_cache=None):
         """
         Initializes the game controller with a board, a sequence of pieces, and a search algorithm.
+        An optional SolutionCache lets play_game() replay a stored plan instead of searching.
         """
         self.game_board = game_board
         self.piece_sequence = piece_sequence
         self.search_algorithm = search_algorithm
+        self.solution_cache = solution_cache
         self.score = 0
+        # Bitmask mirror of game_board.board; every rule check runs on it and the list board is kept in sync
+        self.bitboard = BitBoard.from_grid(game_board.board)
 
     def play_game(self):
         """
         Executes the game using the search algorithm to find a solution sequence.
+        If the search stops early on its time or node budget, the partial plan it returns is still played,
+        but only a plan that places every piece counts as a win.
         """
         initial_state = GameState(self.game_board, self.piece_sequence.sequence)
-        solution = self.search_algorithm.search(initial_state)
+        pieces_to_place = len(self.piece_sequence.sequence)
+        solution = find_plan(self.search_algorithm, initial_state, self.solution_cache)
 
         if solution:
             for piece_name, row, col in solution:
-                piece = self.piece_sequence.piece_definitions[piece_name]
+                _, piece = self.piece_sequence.get_next_piece() # The piece itself, diamonds included
                 self.place_piece(piece, row, col)
-                self.piece_sequence.sequence.pop(0)
-            return True
+            return len(solution) == pieces_to_place
         return False
 
     def can_place_piece(self, piece, top_left_row, top_left_col):
         """
         Checks if a piece can be placed at a given position without overlapping filled cells or going out of bounds.
         """
-        piece_rows = len(piece)
-        piece_cols = len(piece[0])
-
-        # Ensure the piece fits within the board boundaries
-        if (top_left_row < 0 or top_left_col < 0 or
-                top_left_row + piece_rows > self.game_board.rows or
-                top_left_col + piece_cols > self.game_board.cols):
-            return False
-
-        # Check for overlapping filled cells or diamonds (value 2)
-        for r in range(piece_rows):
-            for c in range(piece_cols):
-                if piece[r][c] == 1 and (self.game_board.board[top_left_row + r][top_left_col + c] in [1, 2]):
-                    return False
-        return True
+        return rules.can_place(self.bitboard, piece, top_left_row, top_left_col)
 
     def place_piece(self, piece, top_left_row, top_left_col):
         """
         Places a piece on the board if the placement is valid and updates the game state.
         """
-        if not self.can_place_piece(piece, top_left_row, top_left_col):
+        placement = rules.placement_at(self.bitboard, piece, top_left_row, top_left_col)
+        if placement is None or not self.bitboard.can_place(placement.occupancy):
             return False
 
-        piece_rows = len(piece)
-        piece_cols = len(piece[0])
-
-        for r in range(piece_rows):
-            for c in range(piece_cols):
-                if piece[r][c] == 1:
-                    self.game_board.board[top_left_row + r][top_left_col + c] = 1
-                elif piece[r][c] == 2:
-                    self.game_board.board[top_left_row + r][top_left_col + c] = 2
-
-        self.clear_completed_lines()
+        cleared, _, _, points = rules.apply_placement(self.bitboard, placement)
+        self._sync_cells(placement.occupancy | cleared)
+        self.score += points
         return True
 
-    def clear_completed_lines(self):
+    def clear_completed_lines(self, lines=None):
         """
         Clears completed rows and columns, updating the score based on the number of diamonds.
+        Only the given line masks are checked; by default every row and column is.
         """
-        rows_cleared, diamond_score_rows = self.clear_rows()
-        cols_cleared, diamond_score_cols = self.clear_cols()
+        cleared_mask, total_lines_cleared, _, points = rules.clear_lines(self.bitboard, lines)
+        self._sync_cells(cleared_mask)
 
-        total_lines_cleared = rows_cleared + cols_cleared
-        total_diamond_score = diamond_score_rows + diamond_score_cols
-
-        self.score += (total_lines_cleared * 10) + total_diamond_score
+        self.score += points
         return total_lines_cleared
 
-    def clear_rows(self):
-        """
-        Clears completed rows and calculates diamond-based score.
-        """
-        rows_to_clear = [r for r in range(self.game_board.rows) if
-                         all(cell in [1, 2] for cell in self.game_board.board[r])]
-        diamond_score = sum(self.game_board.board[r].count(2) * 10 for r in rows_to_clear)
-
-        for r in rows_to_clear:
-            self.game_board.board[r] = [0] * self.game_board.cols
-
-        return len(rows_to_clear), diamond_score
-
-    def clear_cols(self):
+    def _sync_cells(self, mask):
         """
-        Clears completed columns and calculates diamond-based score.
+        Copies the cells selected by the mask from the bitboard into the list-of-lists board shown by the GUI.
         """
-        cols_to_clear = [c for c in range(self.game_board.cols) if
-                         all(self.game_board.board[r][c] in [1, 2] for r in range(self.game_board.rows))]
-        diamond_score = sum(
-            1 for c in cols_to_clear for r in range(self.game_board.rows) if self.game_board.board[r][c] == 2) * 10
-
-        for c in cols_to_clear:
-            for r in range(self.game_board.rows):
+        cols = self.game_board.cols
+        while mask:
+            low_bit = mask & -mask
+            r, c = divmod(low_bit.bit_length() - 1, cols)
+            if self.bitboard.diamonds & low_bit:
+                self.game_board.board[r][c] = 2
+            elif self.bitboard.filled & low_bit:
+                self.game_board.board[r][c] = 1
+            else:
                 self.game_board.board[r][c] = 0
-
-        return len(cols_to_clear), diamond_score
+            mask ^= low_bit
 
     def is_game_over(self):
         """
@@ -127,13 +100,8 @@ class GameController:
         Checks if there are no valid moves left, leading to defeat.
         """
         piece_name, piece = self.piece_sequence.peek_next_piece()
-        piece_rows, piece_cols = len(piece), len(piece[0])
-
-        for r in range(self.game_board.rows - piece_rows + 1):
-            for c in range(self.game_board.cols - piece_cols + 1):
-                if self.can_place_piece(piece, r, c):
-                    #print(f"There is a valid move in ({r}, {c})") # Debugging line - can be removed
-                    return False  # A valid move exists
+        if rules.has_legal_placement(self.bitboard, piece):
+            return False  # A valid move exists
         return True  # No valid moves available
 
     def play(self, row, col):
@@ -145,13 +113,9 @@ class GameController:
         placed_positions = []
 
         if self.place_piece(piece, row, col):
-            piece_rows = len(piece)
-            piece_cols = len(piece[0])
-
-            for r in range(piece_rows):
-                for c in range(piece_cols):
-                    if piece[r][c] == 1:
-                        placed_positions.append((row + r, col + c))
+            for r, c in piece.cells:
+                if piece[r][c] == 1:
+                    placed_positions.append((row + r, col + c))
 
             self.piece_sequence.get_next_piece()
             return placed_positions
@@ -163,4 +127,4 @@ class GameController:
         Returns the current GameState object representing the game's state.
         Used by AI players to access the game state for decision making.
         """
-        return GameState(copy.deepcopy(self.game_board), copy.deepcopy(self.piece_sequence.sequence))
\ No newline at end of file
+        return GameState(self.game_board, self.piece_sequence.sequence, self.bitboard.copy())
\ No newline at end of file
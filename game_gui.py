@@ -1,7 +1,12 @@
+import queue
+import threading
+import time
 import tkinter as tk
 from tkinter import messagebox
 import game_controller as game_controller
-from search_algorithms import AIPlayer, BFS_AIPlayer, DFSearch, DF_AIPlayer # Import DF_AIPlayer
+from board_canvas import BoardCanvas
+from piece import piece_definitions
+from search_algorithms import AIPlayer, BFS_AIPlayer, DF_AIPlayer, SearchAlgorithm # Import DF_AIPlayer
 
 # Global UI settings - Increased sizes (and further adjustments)
 WINDOW_WIDTH = 400
@@ -10,9 +15,13 @@ FONT_LARGE = ("Arial", 24)
 FONT_MEDIUM = ("Arial", 18)  # Slightly increased medium font
 FONT_SMALL = ("Arial", 14)   # Slightly increased small font
 BUTTON_WIDTH = 25
-CELL_BORDER_WIDTH = 1
 CELL_COLORS = {0: "white", 1: "blue", 2: "red", "last_placed": "green"}
 HIGHLIGHT_COLOR = "yellow"
+PREVIEW_ROWS = max(len(shape) for shape in piece_definitions.values()) # Grid size of the next piece preview
+PREVIEW_COLS = max(len(shape[0]) for shape in piece_definitions.values())
+PREVIEW_CELL_SIZE = 25
+POLL_INTERVAL_MS = 100 # How often the UI checks on a running AI search
+AUTO_PLAY_DELAY_MS = 300 # Pause between moves in auto-play, so each move can be seen
 
 
 class GameGUI:
@@ -31,7 +40,12 @@ class GameGUI:
         self.bfs_ai_player = BFS_AIPlayer(self.game) # Initialize BFS AI Player
         self.dfs_ai_player = DF_AIPlayer(self.game) # Initialize DFS AI Player
         self.current_ai_player = self.ai_player # Set default AI to random AI
+        self.current_ai_name = "Random"
         self.last_placed_positions = []
+        self._ai_results = queue.Queue() # (move, error) handed from the search thread to the Tk thread
+        self._ai_thread = None # Thread running the current AI search, None when idle
+        self._ai_start_time = 0.0
+        self._ai_cancelled = False
 
         # Main frames
         self.board_frame = tk.Frame(root)
@@ -49,6 +63,8 @@ class GameGUI:
         self.remaining_pieces_label.pack(pady=15) # Increased pady for remaining_pieces_label
         self.status_label = tk.Label(root, text="", font=FONT_MEDIUM)
         self.status_label.pack(pady=10)     # Increased pady for status_label
+        self.progress_label = tk.Label(root, text="", font=FONT_SMALL) # Live progress of a running AI search
+        self.progress_label.pack()
 
         # User input fields
         input_font = FONT_MEDIUM
@@ -70,61 +86,52 @@ class GameGUI:
         self.dfs_ai_button = tk.Button(root, text="Play DFS AI Turn", command=self.play_dfs_ai_turn, font=FONT_LARGE, width=BUTTON_WIDTH) # DFS AI Button
         self.dfs_ai_button.pack(pady=10)
 
+        # AI turn controls: cancel a running search, or keep the AI playing until the game is over
+        self.ai_control_frame = tk.Frame(root)
+        self.ai_control_frame.pack(pady=10)
+        self.cancel_button = tk.Button(self.ai_control_frame, text="Cancel", command=self.cancel_ai_turn,
+                                       font=FONT_MEDIUM, state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.LEFT, padx=5)
+        self.auto_play = tk.BooleanVar(value=False)
+        tk.Checkbutton(self.ai_control_frame, text="Auto-play until game over", variable=self.auto_play,
+                       font=FONT_SMALL).pack(side=tk.LEFT, padx=5)
+
+        # Board and next piece views, drawn once and recolored after every move
+        self.board_view = BoardCanvas(self.board_frame, self.game.game_board.rows, self.game.game_board.cols,
+                                      on_click=self.on_cell_click, on_enter=self.on_cell_enter,
+                                      on_leave=self.on_cell_leave)
+        self.board_view.pack(fill=tk.BOTH, expand=True)
+        self.next_piece_label = tk.Label(self.next_piece_frame, text="", font=FONT_MEDIUM)
+        self.next_piece_label.pack()
+        self.next_piece_view = BoardCanvas(self.next_piece_frame, PREVIEW_ROWS, PREVIEW_COLS,
+                                           cell_size=PREVIEW_CELL_SIZE, show_labels=False)
+        self.next_piece_view.pack()
 
         # Initialize board and UI elements
-        self.cells = {}
         self.update_board_display()
         self.update_next_piece_display()
         self.update_score_display()
 
     def update_board_display(self):
         """Updates the board display."""
-        self._create_board_grid()
         self._update_cell_colors()
 
-    def _create_board_grid(self):
-        """Creates the board grid."""
-        # Clear existing grid if any
-        for widget in self.board_frame.winfo_children():
-            widget.destroy()
-        self.cells = {} # Reset cells dictionary
-
-        # Configure grid to resize with frame
-        for i in range(self.game.game_board.rows + 1): # +1 for row numbers
-            self.board_frame.rowconfigure(i, weight=1)
-        for j in range(self.game.game_board.cols + 1): # +1 for col numbers
-            self.board_frame.columnconfigure(j, weight=1)
-
-        for c in range(self.game.game_board.cols):
-            col_label = tk.Label(self.board_frame, text=str(c), font=FONT_SMALL)
-            col_label.grid(row=0, column=c + 1, padx=1, pady=1, sticky="ew") # sticky to fill cell
-
-        for r in range(self.game.game_board.rows):
-            row_label = tk.Label(self.board_frame, text=str(r), font=FONT_SMALL)
-            row_label.grid(row=r + 1, column=0, padx=1, pady=1, sticky="ew") # sticky to fill cell
-            for c in range(self.game.game_board.cols):
-                if (r, c) not in self.cells:
-                    cell_label = tk.Label(self.board_frame, width=2, height=1, relief=tk.SOLID,
-                                          borderwidth=CELL_BORDER_WIDTH, font=FONT_SMALL)
-                    cell_label.grid(row=r + 1, column=c + 1, padx=1, pady=1, sticky="nsew") # sticky to fill cell
-                    cell_label.bind("<Button-1>", lambda event, row=r, col=c: self.on_cell_click(row, col))
-                    cell_label.bind("<Enter>", lambda event, row=r, col=c: self.on_cell_enter(row, col))
-                    cell_label.bind("<Leave>", lambda event, row=r, col=c: self.on_cell_leave(row, col))
-                    self.cells[(r, c)] = cell_label
-
     def on_cell_enter(self, row, col):
         """Handles cell enter events."""
-        self.cells[(row, col)].config(bg=HIGHLIGHT_COLOR)
+        self.board_view.set_color(row, col, HIGHLIGHT_COLOR)
 
     def on_cell_leave(self, row, col):
         """Handles cell leave events."""
         if (row, col) in self.last_placed_positions:
-            self.cells[(row, col)].config(bg=CELL_COLORS["last_placed"])
+            self.board_view.set_color(row, col, CELL_COLORS["last_placed"])
         else:
-            self.cells[(row, col)].config(bg=CELL_COLORS.get(self.game.game_board.board[row][col]))
+            self.board_view.set_color(row, col, CELL_COLORS.get(self.game.game_board.board[row][col]))
 
     def on_cell_click(self, row, col):
         """Handles cell click events."""
+        if self._ai_thread is not None: # The AI is reading the game; the click would change it under the search
+            self.status_label.config(text="Wait for the AI turn to finish.")
+            return
         placed_positions = self.game.play(row, col)
         if placed_positions:
             self.last_placed_positions = placed_positions
@@ -138,40 +145,31 @@ class GameGUI:
             self.status_label.config(text="Invalid move. Try again.")
 
     def _update_cell_colors(self):
-        """Updates the colors of the cells."""
-        for r in range(self.game.game_board.rows):
-            for c in range(self.game.game_board.cols):
-                cell_value = self.game.game_board.board[r][c]
-                color = CELL_COLORS.get(cell_value, "white")
-                if (r, c) in self.last_placed_positions:
-                    color = "green"
-                self.cells[(r, c)].config(bg=color)
+        """Updates the colors of the cells; only cells whose color changed are redrawn."""
+        last_placed = set(self.last_placed_positions)
+        colors = [[CELL_COLORS["last_placed"] if (r, c) in last_placed else CELL_COLORS.get(cell_value, "white")
+                   for c, cell_value in enumerate(board_row)]
+                  for r, board_row in enumerate(self.game.game_board.board)]
+        self.board_view.draw(colors)
 
     def update_next_piece_display(self):
         """Updates the next piece display."""
-        self._clear_next_piece_frame()
         next_piece_info = self.game.piece_sequence.peek_next_piece()
         if next_piece_info:
             next_piece_name, next_piece_shape = next_piece_info
-            tk.Label(self.next_piece_frame, text=f"Next Piece: {next_piece_name}", font=FONT_MEDIUM).pack()
+            self.next_piece_label.config(text=f"Next Piece: {next_piece_name}")
             self._draw_next_piece_grid(next_piece_shape)
         else:
-            tk.Label(self.next_piece_frame, text="No more pieces", font=FONT_MEDIUM).pack()
-
-    def _clear_next_piece_frame(self):
-        """Clears the next piece frame."""
-        for widget in self.next_piece_frame.winfo_children():
-            widget.destroy()
+            self.next_piece_label.config(text="No more pieces")
+            self._draw_next_piece_grid([])
 
     def _draw_next_piece_grid(self, shape):
-        """Draws the next piece grid."""
-        piece_grid = tk.Frame(self.next_piece_frame)
-        piece_grid.pack()
-        for r in range(len(shape)):
-            for c in range(len(shape[0])):
-                color = "red" if shape[r][c] == 2 else "blue" if shape[r][c] == 1 else "white"
-                tk.Label(piece_grid, width=2, height=1, relief=tk.SOLID, borderwidth=CELL_BORDER_WIDTH,
-                         bg=color).grid(row=r, column=c, padx=1, pady=1)
+        """Draws the next piece grid; preview cells outside the piece are hidden."""
+        colors = [[None] * PREVIEW_COLS for _ in range(PREVIEW_ROWS)]
+        for r, shape_row in enumerate(shape):
+            for c, cell in enumerate(shape_row):
+                colors[r][c] = "red" if cell == 2 else "blue" if cell == 1 else "white"
+        self.next_piece_view.draw(colors)
 
     def update_score_display(self):
         """Updates the score label."""
@@ -208,54 +206,127 @@ class GameGUI:
         """
         Makes the Random AI play one step and updates the UI."""
         self.current_ai_player = self.ai_player # Set to Random AI
+        self.current_ai_name = "Random"
         self._play_ai_turn()
 
     def play_bfs_ai_turn(self):
         """Makes the BFS AI play one step and updates the UI."""
         self.current_ai_player = self.bfs_ai_player # Set to BFS AI
+        self.current_ai_name = "BFS"
         self._play_ai_turn()
 
     def play_dfs_ai_turn(self):
         """Makes the DFS AI play one step and updates the UI."""
         self.current_ai_player = self.dfs_ai_player # Set to DFS AI
+        self.current_ai_name = "DFS"
         self._play_ai_turn()
 
+    def cancel_ai_turn(self):
+        """Stops the running AI search and auto-play; the move it was looking for is not played."""
+        self.auto_play.set(False)
+        if self._ai_thread is not None:
+            self._ai_cancelled = True
+            self._cancel_search()
+            self.status_label.config(text="Cancelling...")
+
     def _play_ai_turn(self):
-        """General method to make the currently selected AI player play a turn."""
-        self._check_game_status()
-        move = self.current_ai_player.play_step() # Get the move from AI
-        if move:
+        """
+        Starts a turn of the currently selected AI player.
+
+        The move is chosen on a worker thread so the window stays responsive during long searches;
+        _poll_ai_turn() picks the move up on the Tk thread and plays it.
+        """
+        if self._ai_thread is not None or self.game.is_game_over():
+            return
+        self._ai_cancelled = False
+        self._ai_start_time = time.perf_counter()
+        self._set_controls_state(tk.DISABLED) # The game must not change while the AI is reading it
+        self.cancel_button.config(state=tk.NORMAL)
+        self.status_label.config(text=f"{self.current_ai_name} AI is thinking...")
+        self._ai_thread = threading.Thread(target=self._run_ai_search, args=(self.current_ai_player,), daemon=True)
+        self._ai_thread.start()
+        self.root.after(POLL_INTERVAL_MS, self._poll_ai_turn)
+
+    def _run_ai_search(self, player):
+        """Worker thread: chooses the AI's move and hands it to the Tk thread."""
+        try:
+            self._ai_results.put((player.choose_move(), None))
+        except Exception as error: # Reported on the Tk thread instead of dying silently with the thread
+            self._ai_results.put((None, error))
+
+    def _poll_ai_turn(self):
+        """Tk thread: shows the search progress until the worker delivers its move, then plays it."""
+        try:
+            move, error = self._ai_results.get_nowait()
+        except queue.Empty:
+            if self._ai_cancelled:
+                self._cancel_search() # Again, in case the search had not started when Cancel was pressed
+            self._update_progress_label()
+            self.root.after(POLL_INTERVAL_MS, self._poll_ai_turn)
+            return
+
+        self._ai_thread = None
+        self._update_progress_label()
+        self.cancel_button.config(state=tk.DISABLED)
+        self._set_controls_state(tk.NORMAL)
+        if self._ai_cancelled:
+            if hasattr(self.current_ai_player, "reset_plan"):
+                self.current_ai_player.reset_plan() # The plan of a cancelled search is only partial
+            self.status_label.config(text=f"{self.current_ai_name} AI search cancelled.")
+        elif error is not None:
+            self.auto_play.set(False)
+            self.status_label.config(text=f"{self.current_ai_name} AI failed: {error}")
+        elif move is None:
+            self.auto_play.set(False)
+            self.status_label.config(text=f"{self.current_ai_name} AI couldn't find a valid move.")
+        else:
             piece_name, row, col = move # Unpack the move
             placed_positions = self.game.play(row, col) # Play the move on the game
             if placed_positions: # If piece was placed successfully (always should be if AI returns valid move)
                 self.last_placed_positions = placed_positions
                 self.update_board_display()
-                self._update_next_piece_display()
+                self.update_next_piece_display()
                 self.update_score_display()
                 self._update_remaining_pieces_label()
-                ai_type = "Random" if isinstance(self.current_ai_player, AIPlayer) else ("BFS" if isinstance(self.current_ai_player, BFS_AIPlayer) else "DFS") # Determine AI type name
-                self.status_label.config(text=f"{ai_type} AI placed a piece successfully.")
+                self.status_label.config(text=f"{self.current_ai_name} AI placed a piece successfully.")
                 self._check_game_status()
+                if self.auto_play.get() and not self.game.is_game_over():
+                    self.root.after(AUTO_PLAY_DELAY_MS, self._play_ai_turn)
             else: # Should not happen, but for robustness
-                ai_type = "Random" if isinstance(self.current_ai_player, AIPlayer) else ("BFS" if isinstance(self.current_ai_player, BFS_AIPlayer) else "DFS") # Determine AI type name
-                self.status_label.config(text=f"{ai_type} AI's move was invalid (internal error).")
+                self.auto_play.set(False)
+                self.status_label.config(text=f"{self.current_ai_name} AI's move was invalid (internal error).")
+
+    def _cancel_search(self):
+        """Asks the current AI player's search to stop, if it runs one."""
+        if hasattr(self.current_ai_player, "cancel"):
+            self.current_ai_player.cancel()
+
+    def _update_progress_label(self):
+        """Shows the nodes expanded and the time spent by the running (or latest) AI search."""
+        elapsed = time.perf_counter() - self._ai_start_time
+        search_algorithm = getattr(self.current_ai_player, "search_algorithm", None)
+        if isinstance(search_algorithm, SearchAlgorithm):
+            self.progress_label.config(
+                text=f"Nodes expanded: {search_algorithm.stats.nodes_expanded} | Elapsed: {elapsed:.1f}s")
         else:
-            ai_type = "Random" if isinstance(self.current_ai_player, AIPlayer) else ("BFS" if isinstance(self.current_ai_player, BFS_AIPlayer) else "DFS") # Determine AI type name
-            self.status_label.config(text=f"{ai_type} AI couldn't find a valid move.")
+            self.progress_label.config(text=f"Elapsed: {elapsed:.1f}s")
+
+    def _set_controls_state(self, state):
+        """Enables or disables the buttons that change the game."""
+        self.manual_button.config(state=state)
+        self.ai_button.config(state=state)
+        self.bfs_ai_button.config(state=state)
+        self.dfs_ai_button.config(state=state)
 
     def _check_game_status(self):
         """Checks the game status and displays a message if the game ends."""
         game_over_status = self.game.is_game_over()
         if game_over_status == "victory":
+            self.auto_play.set(False)
             messagebox.showinfo("Game Finished",
                                 f"Congratulations! You placed all pieces. Victory!\nScore: {self.game.score}")
-            self.manual_button.config(state=tk.DISABLED)
-            self.ai_button.config(state=tk.DISABLED)
-            self.bfs_ai_button.config(state=tk.DISABLED)
-            self.dfs_ai_button.config(state=tk.DISABLED)
+            self._set_controls_state(tk.DISABLED)
         elif game_over_status == "defeat":
+            self.auto_play.set(False)
             messagebox.showinfo("Game Over", f"Sorry! You have lost. Defeat!\nScore: {self.game.score}")
-            self.manual_button.config(state=tk.DISABLED)
-            self.ai_button.config(state=tk.DISABLED)
-            self.bfs_ai_button.config(state=tk.DISABLED)
-            self.dfs_ai_button.config(state=tk.DISABLED)
\ No newline at end of file
+            self._set_controls_state(tk.DISABLED)
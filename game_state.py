@@ -1,89 +1,154 @@
-import copy
+from collections import namedtuple
+
+import rules
+from bitboard import BitBoard
+from placement_index import get_placement_index
+from zobrist import get_zobrist_keys
+
+# Everything undo_move() needs to revert apply_move() exactly
+MoveRecord = namedtuple("MoveRecord", ["occupancy", "diamonds", "cleared", "cleared_diamonds", "score", "hash_delta"])
 
 class GameState:
-    def __init__(self, game_board, remaining_pieces):
+    def __init__(self, game_board, remaining_pieces, bitboard=None, zobrist_hash=None, cursor=0):
+        """
+        Args:
+            game_board (GameBoard): The board the game started from.
+            remaining_pieces (sequence): The (piece_name, shape) pairs still to place. A tuple is shared as is;
+                any other sequence is copied into one tuple once.
+            bitboard (BitBoard, optional): The board contents; defaults to those of game_board.
+            zobrist_hash (int, optional): Hash of the position, computed when not given.
+            cursor (int): Index in remaining_pieces of the next piece to place.
+        """
         self.game_board = game_board
-        self.board = copy.deepcopy(game_board.board)
-        self.remaining_pieces = copy.deepcopy(remaining_pieces)
+        # The board lives in two integer masks; the list-of-lists view is built on demand
+        self.bitboard = bitboard if bitboard is not None else BitBoard.from_grid(game_board.board)
+        self.placement_index = get_placement_index(self.bitboard.rows, self.bitboard.cols)
+        self.zobrist_keys = get_zobrist_keys(self.bitboard.rows, self.bitboard.cols)
+        # One immutable sequence shared by every state of a search; the cursor marks the next piece
+        self.pieces = remaining_pieces if isinstance(remaining_pieces, tuple) else tuple(remaining_pieces)
+        self.cursor = cursor
+        # Zobrist hash of (board, pieces_left), kept up to date incrementally by every move
+        if zobrist_hash is None:
+            zobrist_hash = self.zobrist_keys.hash_position(self.bitboard.filled, self.bitboard.diamonds, self.pieces_left)
+        self.zobrist_hash = zobrist_hash
+
+    @property
+    def pieces_left(self):
+        """Number of pieces still to place."""
+        return len(self.pieces) - self.cursor
+
+    @property
+    def remaining_pieces(self):
+        """The (piece_name, shape) pairs still to place, as a new tuple; use next_piece() on hot paths."""
+        return self.pieces[self.cursor:]
+
+    def next_piece(self):
+        """Returns the (piece_name, shape) pair to place next, or None once every piece is placed."""
+        return self.pieces[self.cursor] if self.cursor < len(self.pieces) else None
+
+    def copy(self):
+        """Returns an independent copy of the position; the piece sequence stays shared."""
+        return self._derive(self.bitboard.copy(), self.zobrist_hash, self.cursor)
+
+    def _derive(self, bitboard, zobrist_hash, cursor):
+        """Builds a state of the same game without repeating the lookups of __init__."""
+        state = GameState.__new__(GameState)
+        state.game_board = self.game_board
+        state.bitboard = bitboard
+        state.placement_index = self.placement_index
+        state.zobrist_keys = self.zobrist_keys
+        state.pieces = self.pieces
+        state.cursor = cursor
+        state.zobrist_hash = zobrist_hash
+        return state
+
+    def __getstate__(self):
+        """Pickles only the position; the shared placement index and Zobrist keys are looked up again on load."""
+        state = self.__dict__.copy()
+        del state["placement_index"], state["zobrist_keys"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.placement_index = get_placement_index(self.bitboard.rows, self.bitboard.cols)
+        self.zobrist_keys = get_zobrist_keys(self.bitboard.rows, self.bitboard.cols)
+
+    @property
+    def board(self):
+        """
+        Read-only snapshot of the board as rows of cells (0 = empty, 1 = block, 2 = diamond).
+
+        The board lives in bitboard; this view is rebuilt on every access, in O(rows * cols), and its rows are
+        tuples, so an attempt to edit it fails instead of silently changing nothing. Use bitboard on hot paths.
+        """
+        return tuple(map(tuple, self.bitboard.to_grid()))
+
+    def board_key(self):
+        """Hashable key identifying the board contents, used by the search algorithms."""
+        return self.bitboard.key()
 
     def generate_successor(self, piece, row, col):
-        new_board = copy.deepcopy(self.board)
-        piece_rows = len(piece)
-        piece_cols = len(piece[0])
-        for r in range(piece_rows):
-            for c in range(piece_cols):
-                if piece[r][c] == 1:
-                    new_board[row + r][col + c] = 1
-        new_remaining_pieces = self.remaining_pieces[1:]
-        return GameState(self.game_board.get_copy_with_new_board(new_board), new_remaining_pieces)
+        successor, _ = self.generate_successor_with_score(piece, row, col)
+        return successor
 
     def generate_successor_with_score(self, piece, row, col): # Modified to return score
-        new_board = copy.deepcopy(self.board)
-        piece_rows = len(piece)
-        piece_cols = len(piece[0])
-        for r in range(piece_rows):
-            for c in range(piece_cols):
-                if piece[r][c] == 1:
-                    new_board[row + r][col + c] = 1 # Place piece
-                elif piece[r][c] == 2:
-                    new_board[row + r][col + c] = 2 # Place diamond if part of piece
-        score_increase = self.clear_lines_score(new_board) # Calculate score increase from clearing lines
-        new_remaining_pieces = self.remaining_pieces[1:]
-        return GameState(self.game_board.get_copy_with_new_board(new_board), new_remaining_pieces), score_increase # Return new state and score
+        placement = rules.placement_at(self.bitboard, piece, row, col, self.placement_index)
+        new_bitboard = self.bitboard.copy()
+        # Place piece and its diamonds, then clear the lines it completed
+        cleared, cleared_diamonds, _, score_increase = rules.apply_placement(new_bitboard, placement)
+        new_hash = self.zobrist_hash ^ self.zobrist_keys.move_delta(
+            placement.occupancy, placement.diamonds, cleared, cleared_diamonds, self.pieces_left)
+        return self._derive(new_bitboard, new_hash, self.cursor + 1), score_increase # Return new state and score
+
+    def apply_move(self, piece, row, col):
+        """
+        Places the piece on this state's board in place and clears the completed lines.
+
+        The board, the cursor and zobrist_hash are updated. Returns a MoveRecord to hand to undo_move().
+        """
+        return self.apply_placement(rules.placement_at(self.bitboard, piece, row, col, self.placement_index))
+
+    def apply_placement(self, placement):
+        """Same as apply_move() for a Placement taken from the placement index."""
+        cleared, cleared_diamonds, _, score = rules.apply_placement(self.bitboard, placement)
+        hash_delta = self.zobrist_keys.move_delta(
+            placement.occupancy, placement.diamonds, cleared, cleared_diamonds, self.pieces_left)
+        self.zobrist_hash ^= hash_delta
+        self.cursor += 1
+        return MoveRecord(placement.occupancy, placement.diamonds, cleared, cleared_diamonds, score, hash_delta)
+
+    def undo_move(self, record):
+        """Reverts a move made with apply_move() or apply_placement(), restoring cleared lines and diamonds."""
+        self.bitboard.undo(record.occupancy, record.diamonds, record.cleared, record.cleared_diamonds)
+        self.zobrist_hash ^= record.hash_delta
+        self.cursor -= 1
 
     def is_goal(self):
-        return not self.remaining_pieces
+        return self.cursor >= len(self.pieces)
 
     def get_possible_actions(self, piece):
-        actions = []
-        piece_rows = len(piece)
-        piece_cols = len(piece[0])
-        for r in range(self.game_board.rows - piece_rows + 1):
-            for c in range(self.game_board.cols - piece_cols + 1):
-                if self.can_place_piece(piece, r, c):
-                    actions.append((r, c))
-        return actions
+        return [(p.row, p.col) for p in self.placement_index.legal_placements(piece, self.bitboard.filled)]
 
     def can_place_piece(self, piece, top_left_row, top_left_col):
-        piece_rows = len(piece)
-        piece_cols = len(piece[0])
-        if top_left_row < 0 or top_left_col < 0:
-            return False
-        if top_left_row + piece_rows > self.game_board.rows or top_left_col + piece_cols > self.game_board.cols:
-            return False
-        for r in range(piece_rows):
-            for c in range(piece_cols):
-                if piece[r][c] == 1 and self.board[top_left_row + r][top_left_col + c] == 1:
-                    return False
-        return True
+        return rules.can_place(self.bitboard, piece, top_left_row, top_left_col, self.placement_index)
 
     def calculate_potential_score(self, piece, row, col):
         """Calcula a pontuação potencial de colocar a peça na posição especificada."""
-        temp_board = copy.deepcopy(self.board)
-        piece_rows = len(piece)
-        piece_cols = len(piece[0])
-        for r in range(piece_rows):
-            for c in range(piece_cols):
-                if piece[r][c] == 1:
-                    temp_board[row + r][col + c] = 1
-        lines_cleared = self.clear_lines(temp_board)
-        return lines_cleared * 10
+        temp_board = self.bitboard.copy()
+        temp_board.place(rules.placement_at(temp_board, piece, row, col, self.placement_index).occupancy)
+        _, lines_cleared = temp_board.full_lines()
+        return lines_cleared * rules.LINE_POINTS
 
     def clear_lines_score(self, board):
-        """Checks and clears completed lines, returns score from diamonds in cleared lines."""
-        lines_cleared = 0
-        diamond_score = 0
-        rows_to_clear = [r for r in range(len(board)) if all(cell in [1, 2] for cell in board[r])] # Check for 1 or 2
-        cols_to_clear = [c for c in range(len(board[0])) if all(board[r][c] in [1, 2] for r in range(len(board)))] # Check for 1 or 2
-
-        for r in rows_to_clear:
-            diamond_score += board[r].count(2) * 10 # Add diamond score for row
-            board[r] = [0] * len(board[0])
-            lines_cleared += 1
-        for c in cols_to_clear:
-            for r in range(len(board)):
-                if board[r][c] == 2: # Count diamonds in column
-                    diamond_score += 10 # Add diamond score for column
-                board[r][c] = 0
-            lines_cleared += 1
-        return (lines_cleared * 10) + diamond_score # Return total score (lines + diamonds)
\ No newline at end of file
+        """
+        Checks and clears completed lines, returns score from lines and diamonds in cleared lines.
+
+        Args:
+            board (BitBoard or list): The board to clear in place: a BitBoard, or a list-of-lists board as
+                before the bitboard backend.
+        """
+        if isinstance(board, BitBoard):
+            _, _, _, points = rules.clear_lines(board)
+            return points # Return total score (lines + diamonds)
+        lines, diamonds = rules.clear_grid_lines(board)
+        return rules.move_score(lines, diamonds)
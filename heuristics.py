@@ -0,0 +1,123 @@
+from collections import OrderedDict
+
+from bitboard import line_masks
+from dead_regions import dead_cells
+
+# Heuristic features of a board. Each takes a BitBoard and only works on whole rows, columns or the board mask
+# at once (popcounts and shifts), never cell by cell.
+
+
+def near_complete_mask(bitboard, max_missing=2):
+    """Returns the union of the rows and columns that miss between 1 and max_missing cells."""
+    row_masks, col_masks = line_masks(bitboard.rows, bitboard.cols)
+    filled = bitboard.filled
+    union = 0
+    for mask in row_masks + col_masks:
+        if 0 < mask.bit_count() - (filled & mask).bit_count() <= max_missing:
+            union |= mask
+    return union
+
+
+def near_complete_lines(bitboard, max_missing=2):
+    """Counts the rows and columns that one or two more cells would complete."""
+    row_masks, col_masks = line_masks(bitboard.rows, bitboard.cols)
+    filled = bitboard.filled
+    return sum(1 for mask in row_masks + col_masks
+               if 0 < mask.bit_count() - (filled & mask).bit_count() <= max_missing)
+
+
+def reachable_diamonds(bitboard, max_missing=2):
+    """Counts the diamonds lying in a near-complete line, the ones the next few pieces can collect."""
+    return (bitboard.diamonds & near_complete_mask(bitboard, max_missing)).bit_count()
+
+
+def isolated_holes(bitboard):
+    """Counts the empty cells whose four neighbours are all filled or off the board; only a 1x1 piece fits them."""
+    rows, cols = bitboard.rows, bitboard.cols
+    row_masks, col_masks = line_masks(rows, cols)
+    board_mask = (1 << (rows * cols)) - 1
+    empty = board_mask & ~bitboard.filled
+    neighbours = (((empty << 1) & ~col_masks[0]) | ((empty >> 1) & ~col_masks[-1]) |
+                  (empty << cols) | (empty >> cols)) & board_mask
+    return (empty & ~neighbours).bit_count()
+
+
+def empty_cells(bitboard):
+    """Counts the empty cells."""
+    return bitboard.count_empty()
+
+
+class Heuristic:
+    """
+    Weighted sum of board features, memoized per position.
+
+    Values are cached by the state's Zobrist hash in an LRU cache of cache_size entries, so positions reached
+    again through other move orders are evaluated once. Heuristics compose: h1 + h2 sums the features of both,
+    and h * k scales every weight.
+    """
+
+    def __init__(self, features, cache_size=1 << 16):
+        """
+        Args:
+            features (list): (feature, weight) pairs, where feature is f(bitboard) -> number.
+            cache_size (int): Maximum number of cached values.
+        """
+        self.features = list(features)
+        self.cache_size = cache_size
+        self._cache = OrderedDict() # zobrist hash -> value, least recently used first
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, state):
+        """Returns the heuristic value of the state's board; higher is better."""
+        key = state.zobrist_hash
+        value = self._cache.get(key)
+        if value is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return value
+        self.misses += 1
+        bitboard = state.bitboard
+        value = sum(weight * feature(bitboard) for feature, weight in self.features)
+        self._cache[key] = value
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return value
+
+    def __add__(self, other):
+        return Heuristic(self.features + other.features, max(self.cache_size, other.cache_size))
+
+    def __mul__(self, factor):
+        return Heuristic([(feature, weight * factor) for feature, weight in self.features], self.cache_size)
+
+    def clear_cache(self):
+        """Removes every cached value and resets the hit counters."""
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_cache"] = OrderedDict() # Worker processes start with an empty cache
+        return state
+
+
+def default_heuristic(cache_size=1 << 16):
+    """
+    The board evaluation used by AStarSearch to order equally promising nodes: lines and diamonds about to be
+    cleared count for, isolated holes and dead pockets no piece fits against, and free space slightly for.
+    """
+    return Heuristic([(near_complete_lines, 10), (reachable_diamonds, 10), (isolated_holes, -10),
+                      (dead_cells, -5), (empty_cells, 1)], cache_size)
+
+
+def remaining_moves(state):
+    """
+    Admissible estimate of the moves left to a goal: every remaining piece takes exactly one move, and a state
+    whose next piece fits nowhere cannot reach a goal at all (infinity).
+    """
+    if state.is_goal():
+        return 0
+    if not state.placement_index.has_legal_placement(state.next_piece()[1], state.bitboard.filled):
+        return float('inf')
+    return state.pieces_left
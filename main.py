@@ -1,9 +1,10 @@
 import tkinter as tk
 from game_board import GameBoard
 from piece import PieceSequence, piece_definitions
-from search_algorithms import AStarSearch, BreadthFirstSearch, UniformCostSearch, DFSearch  # Keep all, DFSearch
+from search_algorithms import AStarSearch, BreadthFirstSearch, UniformCostSearch, DFSearch, BranchAndBoundSearch, BeamSearch, MonteCarloTreeSearch  # Keep all, DFSearch
 from game_controller import GameController
 from game_gui import GameGUI
+from presets import DIFFICULTY_PRESETS
 
 
 def create_difficulty_selection_window(root):
@@ -11,12 +12,8 @@ def create_difficulty_selection_window(root):
     difficulty_window = tk.Toplevel(root)
     difficulty_window.title("Select Difficulty")
 
-    # Difficulty levels and their corresponding parameters - MODIFIED DIFFICULTY LEVELS
-    difficulties = {
-        "Easy": {"rows": 5, "cols": 5, "sequence_length": 15, "fill_density": 0.4}, # MODIFIED
-        "Intermediate": {"rows": 7, "cols": 7, "sequence_length": 15, "fill_density": 0.4}, # MODIFIED
-        "Hard": {"rows": 10, "cols": 10, "sequence_length": 15, "fill_density": 0.4}, # MODIFIED
-    }
+    # Difficulty levels and their corresponding parameters
+    difficulties = DIFFICULTY_PRESETS
 
     selected_difficulty = tk.StringVar(value="Intermediate")  # Default difficulty - MODIFIED to Intermediate
 
@@ -60,7 +57,7 @@ def start_main_game_gui(root, game_params):
 
     piece_sequence = PieceSequence(piece_definitions, sequence_length=game_params["sequence_length"])
 
-    search_algorithm = BreadthFirstSearch()  # Default to BFS for score maximizing. You can change to DFSearch, AStarSearch, UniformCostSearch
+    search_algorithm = BreadthFirstSearch()  # Default to BFS for score maximizing. You can change to DFSearch, BranchAndBoundSearch, AStarSearch, UniformCostSearch, BeamSearch, MonteCarloTreeSearch
     game_controller = GameController(game_board, piece_sequence, search_algorithm)
 
     gui = GameGUI(root, game_controller)
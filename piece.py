@@ -1,88 +1,187 @@
-import random
-import copy
-
-# Define the shapes of different pieces in the game
-piece_definitions = {
-    'L': [[1, 0], [1, 0], [1, 1]],  # 'L' piece, normal orientation
-    'L_90': [[1, 1, 1], [1, 0, 0]],  # 'L' piece, 90 degrees rotated
-    'L_180': [[1, 1], [0, 1], [0, 1]],  # 'L' piece, 180 degrees rotated
-    'L_270': [[0, 0, 1], [1, 1, 1]],  # 'L' piece, 270 degrees rotated
-
-    'I': [[1], [1], [1]],  # 'I' piece, normal orientation
-    'I_90': [[1, 1, 1]],  # 'I' piece, 90 degrees rotated
-
-    'T': [[1, 1, 1], [0, 1, 0]],  # 'T' piece, normal orientation
-    'T_90': [[0, 1], [1, 1], [0, 1]],  # 'T' piece, 90 degrees rotated
-    'T_180': [[0, 1, 0], [1, 1, 1]],  # 'T' piece, 180 degrees rotated
-    'T_270': [[1, 0], [1, 1], [1, 0]],  # 'T' piece, 270 degrees rotated
-
-    'Square': [[1, 1], [1, 1]],  # 'Square' piece, no rotation
-    'Z': [[1, 1, 0], [0, 1, 1]],  # 'Z' piece, normal orientation
-    'Z_90': [[0, 1], [1, 1], [1, 0]],  # 'Z' piece, 90 degrees rotated
-
-    'S': [[0, 1, 1], [1, 1, 0]],  # 'S' piece, normal orientation
-    'S_90': [[1, 0], [1, 1], [0, 1]],  # 'S' piece, 90 degrees rotated
-}
-
-
-# Class to generate and manage a sequence of pieces
-class PieceSequence:
-    def __init__(self, piece_definitions, sequence_length=10, diamond_probability=0.1):
-        """
-        Initializes the PieceSequence object with piece definitions and the desired sequence length.
-
-        :param piece_definitions: Dictionary containing the shapes of different pieces.
-        :param sequence_length: Length of the sequence to generate. Default is 10.
-        :param diamond_probability: Probability (0 to 1) of a diamond appearing in a piece.
-        """
-        self.piece_definitions = piece_definitions  # The available piece definitions
-        self.sequence_length = sequence_length  # The length of the sequence to generate
-        self.diamond_probability = diamond_probability  # Probability of diamonds appearing
-        self.sequence = []  # The list to store the generated sequence
-        self.generate_sequence()  # Generate the initial sequence
-
-    def generate_sequence(self):
-        """
-        Generates a random sequence of pieces based on the piece definitions.
-        The sequence is stored in self.sequence.
-        """
-        self.sequence = []  # Clear the sequence before generating a new one
-        piece_types = list(self.piece_definitions.keys())  # List of available piece types
-
-        # Generate the sequence by randomly choosing pieces
-        for _ in range(self.sequence_length):
-            chosen_piece = random.choice(piece_types)  # Randomly select a piece type
-            piece_shape = copy.deepcopy(self.piece_definitions[chosen_piece])  # Deep copy to avoid mutation
-            self.add_diamonds_to_piece(piece_shape)  # Add diamonds based on probability
-            self.sequence.append((chosen_piece, piece_shape))  # Add the chosen piece to the sequence
-
-    def add_diamonds_to_piece(self, piece):
-        """
-        Randomly adds diamonds (value 2) to the piece based on the diamond probability.
-        """
-        for r in range(len(piece)):
-            for c in range(len(piece[0])):
-                if piece[r][c] == 1 and random.random() < self.diamond_probability:
-                    piece[r][c] = 2  # Convert cell to diamond
-
-    def get_next_piece(self):
-        """
-        Returns the next piece in the sequence and removes it from the list.
-        If the sequence is empty, it regenerates the sequence first.
-
-        :return: A tuple containing the piece type and its shape.
-        """
-        if not self.sequence:  # If the sequence is empty
-            self.generate_sequence()  # Regenerate the sequence
-        return self.sequence.pop(0)  # Pop and return the first piece in the sequence
-
-    def peek_next_piece(self):
-        """
-        Returns the next piece in the sequence without removing it.
-        If the sequence is empty, returns None.
-
-        :return: A tuple containing the piece type and its shape, or None if the sequence is empty.
-        """
-        if self.sequence:
-            return self.sequence[0]  # Return the first piece in the sequence without removing it
-        return None  # Return None if the sequence is empty
+import random
+from collections import deque
+
+# Define the shapes of different pieces in the game
+piece_definitions = {
+    'L': [[1, 0], [1, 0], [1, 1]],  # 'L' piece, normal orientation
+    'L_90': [[1, 1, 1], [1, 0, 0]],  # 'L' piece, 90 degrees rotated
+    'L_180': [[1, 1], [0, 1], [0, 1]],  # 'L' piece, 180 degrees rotated
+    'L_270': [[0, 0, 1], [1, 1, 1]],  # 'L' piece, 270 degrees rotated
+
+    'I': [[1], [1], [1]],  # 'I' piece, normal orientation
+    'I_90': [[1, 1, 1]],  # 'I' piece, 90 degrees rotated
+
+    'T': [[1, 1, 1], [0, 1, 0]],  # 'T' piece, normal orientation
+    'T_90': [[0, 1], [1, 1], [0, 1]],  # 'T' piece, 90 degrees rotated
+    'T_180': [[0, 1, 0], [1, 1, 1]],  # 'T' piece, 180 degrees rotated
+    'T_270': [[1, 0], [1, 1], [1, 0]],  # 'T' piece, 270 degrees rotated
+
+    'Square': [[1, 1], [1, 1]],  # 'Square' piece, no rotation
+    'Z': [[1, 1, 0], [0, 1, 1]],  # 'Z' piece, normal orientation
+    'Z_90': [[0, 1], [1, 1], [1, 0]],  # 'Z' piece, 90 degrees rotated
+
+    'S': [[0, 1, 1], [1, 1, 0]],  # 'S' piece, normal orientation
+    'S_90': [[1, 0], [1, 1], [0, 1]],  # 'S' piece, 90 degrees rotated
+}
+
+
+# Number of low bits of a piece id that hold its diamond pattern (one bit per filled cell of the shape)
+DIAMOND_BITS = max(sum(cell != 0 for row in shape for cell in row) for shape in piece_definitions.values())
+
+_interned = {}  # (name, shape rows) -> Piece
+_custom_ids = {}  # (name, shape rows) -> id of pieces whose shape is not in piece_definitions
+
+
+class Piece(tuple):
+    """
+    Immutable piece: a tuple of row tuples (0 = empty, 1 = block, 2 = diamond), so it can be used anywhere a
+    shape is expected, with the data the game needs precomputed once.
+
+    Pieces are interned: make_piece() returns the same object for the same name and shape, so pieces can be
+    compared and hashed cheaply and a sequence holds no per-piece copies.
+    """
+
+    def __new__(cls, name, shape, piece_id):
+        """
+        Use make_piece() instead of calling this directly.
+
+        :param name: The piece type, e.g. 'L_90'.
+        :param shape: The shape as rows of cell values.
+        :param piece_id: The stable id of the piece (see make_piece()).
+        """
+        piece = super().__new__(cls, (tuple(row) for row in shape))
+        piece.name = name
+        piece.id = piece_id
+        piece.height = len(piece)  # Bounding box
+        piece.width = len(piece[0])
+        # (row, col) offsets of the filled cells and of the diamond cells, in row-major order
+        piece.cells = tuple((r, c) for r, row in enumerate(piece) for c, cell in enumerate(row) if cell)
+        piece.diamond_cells = tuple((r, c) for r, c in piece.cells if piece[r][c] == 2)
+        piece._hash = tuple.__hash__(piece)
+        piece._masks = {}  # board columns -> (occupancy mask, diamond mask)
+        return piece
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        # Unpickling goes through make_piece(), so worker processes share interned pieces too
+        return make_piece, (self.name, tuple(self))
+
+    def masks(self, cols):
+        """
+        Returns the (occupancy, diamonds) bit masks of the piece anchored at the top-left cell of a board
+        with `cols` columns; see bitboard.piece_masks().
+        """
+        masks = self._masks.get(cols)
+        if masks is None:
+            occupancy = 0
+            for r, c in self.cells:
+                occupancy |= 1 << (r * cols + c)
+            diamonds = 0
+            for r, c in self.diamond_cells:
+                diamonds |= 1 << (r * cols + c)
+            masks = self._masks[cols] = (occupancy, diamonds)
+        return masks
+
+    def with_diamonds(self, diamond_cells):
+        """
+        Returns the interned piece of the same type with diamonds on the given cells instead.
+
+        :param diamond_cells: (row, col) offsets of filled cells that hold a diamond.
+        """
+        shape = [[1 if cell else 0 for cell in row] for row in self]
+        for r, c in diamond_cells:
+            shape[r][c] = 2
+        return make_piece(self.name, shape)
+
+
+def make_piece(name, shape):
+    """
+    Returns the interned Piece for a name and shape, creating it on first use.
+
+    The id is stable between runs: the index of the name in piece_definitions shifted left by DIAMOND_BITS,
+    with the diamond pattern (one bit per filled cell, in row-major order) in the low bits. Shapes that are
+    not in piece_definitions get ids after those of piece_definitions, in the order they are first seen.
+
+    :param name: The piece type.
+    :param shape: The shape as rows of cell values (0 = empty, 1 = block, 2 = diamond).
+    :return: The Piece.
+    """
+    key = (name, tuple(tuple(row) for row in shape))
+    piece = _interned.get(key)
+    if piece is None:
+        cells = [cell for row in key[1] for cell in row if cell]
+        outline = [[1 if cell else 0 for cell in row] for row in key[1]]
+        if piece_definitions.get(name) == outline:
+            diamond_bits = sum(1 << i for i, cell in enumerate(cells) if cell == 2)
+            piece_id = (list(piece_definitions).index(name) << DIAMOND_BITS) | diamond_bits
+        else:
+            piece_id = (len(piece_definitions) + len(_custom_ids)) << DIAMOND_BITS
+            _custom_ids[key] = piece_id
+        piece = _interned[key] = Piece(name, key[1], piece_id)
+    return piece
+
+
+# Class to generate and manage a sequence of pieces
+class PieceSequence:
+    def __init__(self, piece_definitions, sequence_length=10, diamond_probability=0.1):
+        """
+        Initializes the PieceSequence object with piece definitions and the desired sequence length.
+
+        :param piece_definitions: Dictionary containing the shapes of different pieces.
+        :param sequence_length: Length of the sequence to generate. Default is 10.
+        :param diamond_probability: Probability (0 to 1) of a diamond appearing in a piece.
+        """
+        self.piece_definitions = piece_definitions  # The available piece definitions
+        self.sequence_length = sequence_length  # The length of the sequence to generate
+        self.diamond_probability = diamond_probability  # Probability of diamonds appearing
+        self.sequence = deque()  # The pieces still to come, as (piece_name, Piece) pairs; consumed from the left
+        self.generate_sequence()  # Generate the initial sequence
+
+    def generate_sequence(self):
+        """
+        Generates a random sequence of pieces based on the piece definitions.
+        The sequence is stored in self.sequence.
+        """
+        self.sequence = deque()  # Clear the sequence before generating a new one
+        piece_types = list(self.piece_definitions.keys())  # List of available piece types
+        plain_pieces = {name: make_piece(name, shape) for name, shape in self.piece_definitions.items()}
+
+        # Generate the sequence by randomly choosing pieces
+        for _ in range(self.sequence_length):
+            chosen_piece = random.choice(piece_types)  # Randomly select a piece type
+            piece = self.add_diamonds_to_piece(plain_pieces[chosen_piece])  # Add diamonds based on probability
+            self.sequence.append((chosen_piece, piece))  # Add the chosen piece to the sequence
+
+    def add_diamonds_to_piece(self, piece):
+        """
+        Randomly adds diamonds (value 2) to the piece based on the diamond probability.
+
+        :param piece: The Piece without diamonds.
+        :return: The interned Piece with the chosen cells turned into diamonds.
+        """
+        diamond_cells = [(r, c) for r, c in piece.cells if random.random() < self.diamond_probability]
+        return piece.with_diamonds(diamond_cells) if diamond_cells else piece
+
+    def get_next_piece(self):
+        """
+        Returns the next piece in the sequence and removes it from the list.
+        If the sequence is empty, it regenerates the sequence first.
+
+        :return: A tuple containing the piece type and its shape.
+        """
+        if not self.sequence:  # If the sequence is empty
+            self.generate_sequence()  # Regenerate the sequence
+        return self.sequence.popleft()  # Pop and return the first piece in the sequence
+
+    def peek_next_piece(self):
+        """
+        Returns the next piece in the sequence without removing it.
+        If the sequence is empty, returns None.
+
+        :return: A tuple containing the piece type and its shape, or None if the sequence is empty.
+        """
+        if self.sequence:
+            return self.sequence[0]  # Return the first piece in the sequence without removing it
+        return None  # Return None if the sequence is empty
@@ -0,0 +1,74 @@
+from collections import namedtuple
+from functools import lru_cache
+
+from bitboard import piece_masks, touched_lines
+from piece import Piece, piece_definitions
+
+# One anchor position of a piece, with its masks already shifted into place on the board
+# and the masks of the rows and columns it touches (the only lines it can complete)
+Placement = namedtuple("Placement", ["row", "col", "occupancy", "diamonds", "lines"])
+
+
+class PlacementIndex:
+    """
+    Precomputed anchor positions and bit masks of every piece shape for one board size.
+
+    Shapes from piece_definitions are indexed up front; pieces carrying diamonds (value 2 cells)
+    are indexed the first time they are seen. Use get_placement_index() to share one index per size.
+    """
+
+    def __init__(self, rows, cols):
+        """
+        Builds the index for the board dimensions.
+
+        Args:
+            rows (int): The number of rows on the board.
+            cols (int): The number of columns on the board.
+        """
+        self.rows = rows
+        self.cols = cols
+        self._placements = {}  # shape key -> tuple of Placement
+        for shape in piece_definitions.values():
+            self.placements(shape)
+
+    def placements(self, piece):
+        """
+        Returns every in-bounds anchor of the piece, in row-major order.
+
+        Args:
+            piece (list): The piece shape as a list of lists.
+
+        Returns:
+            tuple: Placement entries for each anchor where the piece fits inside the board.
+        """
+        key = piece if type(piece) is Piece else tuple(map(tuple, piece))
+        placements = self._placements.get(key)
+        if placements is None:
+            occupancy, diamonds = piece_masks(piece, self.cols)
+            piece_rows, piece_cols = len(piece), len(piece[0])
+            placements = tuple(
+                Placement(r, c, occupancy << (r * self.cols + c), diamonds << (r * self.cols + c),
+                          touched_lines(self.rows, self.cols, r, c, piece_rows, piece_cols))
+                for r in range(self.rows - len(piece) + 1)
+                for c in range(self.cols - len(piece[0]) + 1)
+            )
+            self._placements[key] = placements
+        return placements
+
+    def legal_placements(self, piece, filled):
+        """
+        Returns the placements of the piece that do not overlap the filled mask.
+        """
+        return [p for p in self.placements(piece) if not filled & p.occupancy]
+
+    def has_legal_placement(self, piece, filled):
+        """
+        Checks whether the piece can be placed anywhere on a board with the given filled mask.
+        """
+        return any(not filled & p.occupancy for p in self.placements(piece))
+
+
+@lru_cache(maxsize=None)
+def get_placement_index(rows, cols):
+    """Returns the shared PlacementIndex for a board size, building it on first use."""
+    return PlacementIndex(rows, cols)
@@ -0,0 +1,6 @@
+# Difficulty levels and their corresponding game parameters, shared by the GUI and the headless runner
+DIFFICULTY_PRESETS = {
+    "Easy": {"rows": 5, "cols": 5, "sequence_length": 15, "fill_density": 0.4},
+    "Intermediate": {"rows": 7, "cols": 7, "sequence_length": 15, "fill_density": 0.4},
+    "Hard": {"rows": 10, "cols": 10, "sequence_length": 15, "fill_density": 0.4},
+}
@@ -0,0 +1,98 @@
+from bitboard import BitBoard
+from piece import Piece
+from placement_index import get_placement_index
+
+# The rules of the game in one place: where a piece may go, which lines it clears and what that scores.
+# GameController, GameState and the AI players all call these functions, so a plan found by a search
+# replays move for move on the live board.
+
+LINE_POINTS = 10 # Points per cleared row or column
+DIAMOND_POINTS = 10 # Points per diamond in a cleared line
+
+
+def move_score(lines, diamonds):
+    """Returns the points earned by clearing `lines` rows and columns holding `diamonds` diamonds."""
+    return (lines * LINE_POINTS) + (diamonds * DIAMOND_POINTS)
+
+
+def placement_at(bitboard, piece, row, col, placement_index=None):
+    """
+    Looks up the placement of the piece anchored at (row, col).
+
+    The Placement comes from the shared PlacementIndex, so its masks are the ones the searches use.
+
+    Args:
+        placement_index (PlacementIndex, optional): The index of the board size, as cached by GameState;
+            looked up when not given.
+
+    Returns:
+        Placement: The placement, or None if the piece does not lie inside the board there. It may still
+        overlap filled cells; see can_place().
+    """
+    if type(piece) is Piece:
+        height, width = piece.height, piece.width
+    else:
+        height, width = len(piece), len(piece[0])
+    if row < 0 or col < 0 or row + height > bitboard.rows or col + width > bitboard.cols:
+        return None
+    if placement_index is None:
+        placement_index = get_placement_index(bitboard.rows, bitboard.cols)
+    return placement_index.placements(piece)[row * (bitboard.cols - width + 1) + col] # Anchors in row-major order
+
+
+def can_place(bitboard, piece, row, col, placement_index=None):
+    """Checks that the piece lies inside the board at (row, col) and covers no filled cell or diamond."""
+    placement = placement_at(bitboard, piece, row, col, placement_index)
+    return placement is not None and not bitboard.filled & placement.occupancy
+
+
+def legal_placements(bitboard, piece):
+    """Returns every Placement of the piece that does not overlap the board, in row-major order."""
+    return get_placement_index(bitboard.rows, bitboard.cols).legal_placements(piece, bitboard.filled)
+
+
+def has_legal_placement(bitboard, piece):
+    """Checks whether the piece can be placed anywhere on the board."""
+    return get_placement_index(bitboard.rows, bitboard.cols).has_legal_placement(piece, bitboard.filled)
+
+
+def apply_placement(bitboard, placement):
+    """
+    Plays a legal placement on the bitboard in place: stamps the piece with its diamonds and clears every row
+    and column it completes, all at once.
+
+    Returns:
+        tuple: (cleared_mask, cleared_diamonds, lines, points); BitBoard.undo() takes the first two.
+    """
+    cleared, cleared_diamonds, lines = bitboard.apply(placement.occupancy, placement.diamonds, placement.lines)
+    return cleared, cleared_diamonds, lines, move_score(lines, cleared_diamonds.bit_count())
+
+
+def clear_lines(bitboard, lines=None):
+    """
+    Clears the completed rows and columns of the bitboard in place.
+
+    Args:
+        lines (tuple, optional): Line masks to check; defaults to every row and column.
+
+    Returns:
+        tuple: (cleared_mask, lines, diamonds, points).
+    """
+    cleared, _ = bitboard.full_lines(lines)
+    lines_cleared, diamonds_cleared = bitboard.clear_lines(lines)
+    return cleared, lines_cleared, diamonds_cleared, move_score(lines_cleared, diamonds_cleared)
+
+
+def clear_grid_lines(grid):
+    """
+    Clears the completed rows and columns of a list-of-lists board in place, with the same rules as the
+    bitboard: every full line is found first, then they are cleared together.
+
+    Returns:
+        tuple: (lines, diamonds) cleared.
+    """
+    bitboard = BitBoard.from_grid(grid)
+    _, lines, diamonds, _ = clear_lines(bitboard)
+    if lines:
+        grid[:] = bitboard.to_grid()
+    return lines, diamonds
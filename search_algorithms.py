@@ -1,204 +1,1036 @@
 import heapq
+import math
+import os
+import random
+import time
 from abc import ABC, abstractmethod
 from collections import deque
-import copy
+from concurrent.futures import ProcessPoolExecutor
+import rules
+from bitboard import BitBoard, line_masks
+from dead_regions import DeadRegionAnalyzer
+from game_state import GameState
+from heuristics import default_heuristic, remaining_moves
+from placement_index import get_placement_index
+from search_budget import SearchBudget, SearchHooks, SearchResult, SearchStats
+from solution_cache import find_plan
+from zobrist import EXACT, LOWER_BOUND, TranspositionTable
 
 class SearchAlgorithm(ABC):
+    optimal = False # True if a complete plan found within the budget is always the highest-scoring one
+
+    def __init__(self, transposition_table=None, time_limit=None, node_limit=None, hooks=None, profile=False):
+        """
+        Args:
+            transposition_table (TranspositionTable, optional): Table of visited positions keyed by Zobrist hash.
+                Pass one instance to several algorithms to share its memory; it is cleared at the start of every
+                search. Defaults to a private table of the default size.
+            time_limit (float, optional): Seconds each search may run before returning its best plan so far.
+            node_limit (int, optional): Node expansions each search may make before returning its best plan so far.
+            hooks (SearchHooks, optional): Callbacks for node expansions and new best plans.
+            profile (bool): If True, also measure the time spent in move generation, successor creation and
+                transposition table lookups. Off by default since the timers slow the search down.
+        """
+        self.transposition_table = transposition_table if transposition_table is not None else TranspositionTable()
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.hooks = hooks if hooks is not None else SearchHooks()
+        self.profile = profile
+        self.stats = SearchStats() # Statistics of the current (or latest) search
+        self.last_result = None # SearchResult of the latest search
+        self._budget = None # SearchBudget of the current (or latest) search
+
+    @property
+    def solver(self):
+        """Name recorded with the plans this search stores in a SolutionCache; see solution_cache.find_plan()."""
+        return type(self).__name__
+
     @abstractmethod
     def search(self, game_state):
+        """
+        Searches for a plan that places the remaining pieces of game_state.
+
+        Returns the plan as a list of (piece_name, row, col) moves, or None if there is none. If the time or
+        node budget runs out first, the best partial plan found so far is returned instead. The plan, its
+        score, whether it is complete and the run statistics are also stored in last_result.
+        """
         pass
 
-class UniformCostSearch(SearchAlgorithm):
+    def run(self, game_state):
+        """Runs search() and returns its SearchResult."""
+        self.search(game_state)
+        return self.last_result
+
+    def cancel(self):
+        """
+        Stops the running search, which then returns its best plan so far as if its budget had run out.
+        Safe to call from another thread. Subtrees already handed to worker processes still run to completion.
+        """
+        if self._budget is not None:
+            self._budget.cancel()
+
+    def _begin(self):
+        """
+        Starts the budget and statistics of a new search and returns the budget.
+
+        Also binds the operations the searches call per node (_actions, _successor, _probe, _store), wrapped in
+        timers when profiling so the time split lands in the stats.
+        """
+        self._budget = SearchBudget(self.time_limit, self.node_limit)
+        self.stats = SearchStats()
+        table = self.transposition_table
+        self._actions = self._timed(GameState.get_possible_actions, "move_generation_time")
+        self._legal_placements = self._timed(_legal_placements, "move_generation_time")
+        self._successor = self._timed(GameState.generate_successor_with_score, "successor_time")
+        self._apply = self._timed(GameState.apply_placement, "successor_time")
+        self._probe = self._timed(table.probe, "hashing_time")
+        self._store = self._timed(table.store, "hashing_time")
+        self._on_expand = self.hooks.on_expand
+        self._on_goal = self.hooks.on_goal
+        return self._budget
+
+    def _timed(self, function, stat):
+        """Returns function unchanged, or when profiling a wrapper adding its run time to the named stat."""
+        if not self.profile:
+            return function
+        stats = self.stats
+
+        def timed(*args):
+            start = time.perf_counter()
+            result = function(*args)
+            setattr(stats, stat, getattr(stats, stat) + time.perf_counter() - start)
+            return result
+        return timed
+
+    def _goal(self, path, score):
+        """Reports a new best complete plan to the on_goal hook."""
+        if self._on_goal is not None:
+            self._on_goal(path, score)
+
+    def _finish(self, path, score, complete):
+        """Records the SearchResult of the search and returns the plan."""
+        self.stats.elapsed_time = self._budget.elapsed()
+        self.stats.budget_exhausted = self._budget.exhausted
+        self.last_result = SearchResult(path, score, complete, self.stats)
+        return path
+
+    def _finish_partial(self, path, score):
+        """Ends a search without a complete plan; the partial plan is only returned if the budget cut it short."""
+        if not self._budget.exhausted:
+            path, score = None, None
+        return self._finish(path, score, False)
+
+    def _reset_table(self):
+        """Clears the transposition table for a new search and returns it."""
+        self.transposition_table.clear()
+        return self.transposition_table
+
+
+def pack_action(piece_index, row, col):
+    """Packs a move into one int: the index of the piece in the searched sequence, then its row and column."""
+    return (piece_index << 16) | (row << 8) | col
+
+
+def unpack_action(action):
+    """Returns the (piece_index, row, col) packed by pack_action()."""
+    return action >> 16, (action >> 8) & 0xFF, action & 0xFF
+
+
+class SearchNode:
+    """
+    Compact node of the best-first and breadth-first searches.
+
+    A node only points to its parent and stores the move that led to it packed into an int, so queuing a node
+    costs the same at any depth; the path is rebuilt by walking the parents once a plan is returned. The searches
+    drop the state of a node once it is expanded, keeping only the parent chain alive.
+    """
+    __slots__ = ("state", "parent", "action", "g", "score")
+
+    def __init__(self, state, parent=None, action=0, g=0, score=0):
+        """
+        Args:
+            state (GameState): The game state represented by this node.
+            parent (SearchNode, optional): The parent node, None for the root.
+            action (int): The move from the parent, packed with pack_action().
+            g (int): Pieces placed from the root, the path cost.
+            score (int): Points earned on the path from the root.
+        """
+        self.state = state
+        self.parent = parent
+        self.action = action
+        self.g = g
+        self.score = score
+
+    def path(self, pieces):
+        """
+        Rebuilds the moves from the root to this node.
+
+        Args:
+            pieces (list): The (piece_name, shape) pairs of the root state, to name the pieces.
+
+        Returns:
+            list: (piece_name, row, col) moves.
+        """
+        path = []
+        node = self
+        while node.parent is not None:
+            piece_index, row, col = unpack_action(node.action)
+            path.append((pieces[piece_index][0], row, col))
+            node = node.parent
+        path.reverse()
+        return path
+
+
+def _legal_placements(state, piece):
+    """Returns the Placements of the piece that fit on the state's board."""
+    return state.placement_index.legal_placements(piece, state.bitboard.filled)
+
+
+def _search_subtree(algorithm_class, options, state, deadline=None):
+    """
+    Runs one sequential search in a worker process and returns its result as picklable values.
+
+    deadline is the wall-clock time (time.time()) by which every subtree must be done; the time limit is
+    computed when the subtree starts, since subtrees queued behind others start late.
+    """
+    if deadline is not None:
+        options = dict(options, time_limit=max(0.0, deadline - time.time()))
+    algorithm = algorithm_class(**options)
+    result = algorithm.run(state)
+    return result.path, result.score, result.complete, result.stats
+
+
+class RootSplitSearch(SearchAlgorithm):
+    """
+    Base for searches that can run in parallel by splitting the first plies of the tree into independent
+    subtrees, each searched sequentially in its own worker process.
+    """
+    def __init__(self, transposition_table=None, time_limit=None, node_limit=None, workers=1, split_depth=1,
+                 hooks=None, profile=False):
+        """
+        Args:
+            transposition_table, time_limit, node_limit, hooks, profile: See SearchAlgorithm. The hooks only see
+                the expansions made in this process, not those inside the worker processes.
+            workers (int): Worker processes to search with; 1 searches sequentially, None uses every CPU.
+            split_depth (int): Number of plies (1 or 2) expanded here before the subtrees are handed out.
+        """
+        super().__init__(transposition_table, time_limit, node_limit, hooks, profile)
+        self.workers = workers if workers is not None else os.cpu_count()
+        self.split_depth = split_depth
+
     def search(self, game_state):
-        start_state = game_state
-        priority_queue = [(0, start_state, [])]
-        visited = set()
+        if self.workers > 1 and game_state.pieces_left > self.split_depth:
+            return self._root_split_search(game_state)
+        return self._search(game_state)
+
+    @abstractmethod
+    def _search(self, game_state):
+        """The sequential search; same contract as search()."""
+        pass
+
+    def _subtree_options(self):
+        """Constructor arguments of the sequential searches run in the worker processes."""
+        return {"workers": 1, "profile": self.profile}
+
+    def _root_split_search(self, game_state):
+        """
+        Expands the first split_depth plies, searches each resulting subtree in a ProcessPoolExecutor and merges
+        the results: the highest-scoring complete plan wins, ties going to the subtree whose first moves come
+        first in move-generation order, so the answer does not depend on which worker finishes first.
+        """
+        budget = self._begin()
+        subtrees = [([], 0, game_state)] # (prefix moves, prefix score, state)
+        for depth in range(self.split_depth):
+            next_subtrees = []
+            seen = {} # zobrist hash -> index in next_subtrees, keeps one prefix per position
+            for prefix, prefix_score, state in subtrees:
+                if not budget.charge(): # The split plies count against the budget like any other expansion
+                    prefix, prefix_score, _ = max(next_subtrees or subtrees, key=lambda item: (len(item[0]), item[1]))
+                    return self._finish_partial(prefix, prefix_score)
+                piece_name, piece = state.next_piece()
+                actions = self._actions(state, piece)
+                self.stats.record_expansion(depth, len(actions))
+                if self._on_expand is not None:
+                    self._on_expand(state, depth)
+                for row, col in actions:
+                    successor, score_increase = self._successor(state, piece, row, col)
+                    subtree = (prefix + [(piece_name, row, col)], prefix_score + score_increase, successor)
+                    index = seen.get(successor.zobrist_hash)
+                    if index is None:
+                        seen[successor.zobrist_hash] = len(next_subtrees)
+                        next_subtrees.append(subtree)
+                    else:
+                        self.stats.duplicates += 1
+                        if next_subtrees[index][1] < subtree[1]:
+                            next_subtrees[index] = subtree
+            subtrees = next_subtrees
+            self.stats.record_frontier(len(subtrees))
+        if not subtrees:
+            return self._finish_partial([], 0) # The first piece cannot be placed
+
+        options = self._subtree_options()
+        subtree_options = [options] * len(subtrees)
+        if self.node_limit is not None: # What the split plies left of the node budget, shared between subtrees
+            shares, extra = divmod(max(0, self.node_limit - budget.nodes), len(subtrees))
+            subtree_options = [dict(options, node_limit=shares + (index < extra)) for index in range(len(subtrees))]
+        # Subtrees left without a node only count as their prefix
+        searched = [index for index, subtree_option in enumerate(subtree_options)
+                    if subtree_option.get("node_limit") != 0]
+        deadline = time.time() + self.time_limit - budget.elapsed() if self.time_limit is not None else None
+        skipped = SearchStats()
+        skipped.budget_exhausted = True
+        results = [(None, None, False, skipped)] * len(subtrees)
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            for index, result in zip(searched, executor.map(
+                    _search_subtree, [type(self)] * len(searched), [subtree_options[i] for i in searched],
+                    [subtrees[i][2] for i in searched], [deadline] * len(searched))):
+                results[index] = result
+
+        best_complete = None # (path, score)
+        best_partial = ([], 0)
+        for (prefix, prefix_score, _), (path, score, complete, stats) in zip(subtrees, results):
+            self.stats.merge(stats, self.split_depth)
+            budget.exhausted = budget.exhausted or stats.budget_exhausted
+            if path is None:
+                path, score = [], 0
+            candidate = (prefix + path, prefix_score + score)
+            if complete:
+                if best_complete is None or candidate[1] > best_complete[1]: # Strict: earlier subtree wins ties
+                    best_complete = candidate
+            elif (len(candidate[0]), candidate[1]) > (len(best_partial[0]), best_partial[1]):
+                best_partial = candidate
+
+        if best_complete is not None:
+            self._goal(*best_complete)
+            return self._finish(best_complete[0], best_complete[1], True)
+        return self._finish_partial(*best_partial)
+
+
+class UniformCostSearch(RootSplitSearch):
+    def _search(self, game_state):
+        budget = self._begin()
+        pieces = game_state.remaining_pieces
+        priority_queue = [(0, 0, SearchNode(game_state))]  # (cost, counter, node)
+        self._reset_table() # Positions already expanded, with the cost they were reached at
+        counter = 0 # Counter to break ties in priority queue
+        best_partial = priority_queue[0][2] # Deepest (then highest-scoring) node expanded so far
 
         while priority_queue:
-            cost, current_state, path = heapq.heappop(priority_queue)
-            board_tuple = tuple(map(tuple, current_state.board))
+            cost, _, node = heapq.heappop(priority_queue)
+            current_state = node.state
 
-            if board_tuple in visited:
+            if self._probe(current_state.zobrist_hash) is not None:
+                self.stats.duplicates += 1
                 continue
-            visited.add(board_tuple)
+            self._store(current_state.zobrist_hash, current_state.pieces_left, cost, EXACT)
 
             if current_state.is_goal():
-                return path
+                path = node.path(pieces)
+                self._goal(path, node.score)
+                return self._finish(path, node.score, True)
+
+            if (node.g, node.score) > (best_partial.g, best_partial.score):
+                best_partial = node
+            if not budget.charge():
+                break
 
-            piece_name, piece = current_state.remaining_pieces[0]
-            actions = current_state.get_possible_actions(piece)
+            piece_name, piece = current_state.next_piece()
+            actions = self._actions(current_state, piece)
+            self.stats.record_expansion(node.g, len(actions))
+            if self._on_expand is not None:
+                self._on_expand(current_state, node.g)
 
             for row, col in actions:
-                successor = current_state.generate_successor(piece, row, col)
+                successor, score_increase = self._successor(current_state, piece, row, col)
                 new_cost = cost + 1
-                new_path = path + [(piece_name, row, col)]
-                heapq.heappush(priority_queue, (new_cost, successor, new_path))
+                counter += 1
+                heapq.heappush(priority_queue, (new_cost, counter, SearchNode(
+                    successor, node, pack_action(node.g, row, col), node.g + 1, node.score + score_increase)))
+            node.state = None # Expanded: only the path back to the root is still needed
+            self.stats.record_frontier(len(priority_queue))
 
-        return None
+        return self._finish_partial(best_partial.path(pieces), best_partial.score)
 
-class AStarSearch(SearchAlgorithm):
-    def search(self, game_state):
-        def heuristic(state):
-            """Heuristic function that considers potential score and remaining pieces."""
-            if not state.remaining_pieces:
-                return 0
-            piece_name, piece = state.remaining_pieces[0]
-            actions = state.get_possible_actions(piece)
-            if not actions:
-                return len(state.remaining_pieces) * 100 # Penalize states with no actions.
-            best_score = 0
-            for row, col in actions:
-                score = state.calculate_potential_score(piece, row, col)
-                best_score = max(best_score, score)
-            return -best_score + len(state.remaining_pieces)
+class AStarSearch(RootSplitSearch):
+    def __init__(self, heuristic=None, transposition_table=None, time_limit=None, node_limit=None, workers=1,
+                 split_depth=1, hooks=None, profile=False):
+        """
+        Args:
+            heuristic (Heuristic, optional): Board evaluation (higher is better) that orders nodes with equal f.
+                Defaults to heuristics.default_heuristic(). Its cache persists between searches.
+            transposition_table, time_limit, node_limit, workers, split_depth, hooks, profile: See RootSplitSearch.
+        """
+        super().__init__(transposition_table, time_limit, node_limit, workers, split_depth, hooks, profile)
+        self.heuristic = heuristic if heuristic is not None else default_heuristic()
+
+    def _subtree_options(self):
+        options = super()._subtree_options()
+        options["heuristic"] = self.heuristic
+        return options
 
-        start_state = game_state
-        priority_queue = [(heuristic(start_state), 0, 0, start_state, [])]  # (f(n), g(n), counter, state, path)
-        visited = set()
+    def _search(self, game_state):
+        """
+        Performs A* with g = pieces placed and h = remaining_moves(), which is admissible: it is exact for states
+        that can still be completed and infinite for states whose next piece fits nowhere, or that
+        DeadRegionAnalyzer shows can never be completed.
+        Nodes with equal f are expanded in order of score earned plus the heuristic value of the board.
+        """
+        budget = self._begin()
+        pieces = game_state.remaining_pieces
+        dead_regions = DeadRegionAnalyzer(pieces, game_state.bitboard.rows, game_state.bitboard.cols)
+        priority_queue = [(remaining_moves(game_state), 0, 0, SearchNode(game_state))]  # (f(n), -tie-break, counter, node)
+        self._reset_table() # Positions already expanded, with the cost they were reached at
         counter = 0 # Counter to break ties in priority queue
+        best_partial = priority_queue[0][3] # Deepest (then highest-scoring) node expanded so far
 
         while priority_queue:
-            f, g, _, current_state, path = heapq.heappop(priority_queue)
-            board_tuple = tuple(map(tuple, current_state.board))
+            f, _, _, node = heapq.heappop(priority_queue)
+            current_state = node.state
 
-            if board_tuple in visited:
+            if self._probe(current_state.zobrist_hash) is not None:
+                self.stats.duplicates += 1
                 continue
-            visited.add(board_tuple)
+            self._store(current_state.zobrist_hash, current_state.pieces_left, node.g, EXACT)
 
             if current_state.is_goal():
-                return path
+                path = node.path(pieces)
+                self._goal(path, node.score)
+                return self._finish(path, node.score, True)
 
-            piece_name, piece = current_state.remaining_pieces[0]
-            actions = current_state.get_possible_actions(piece)
+            if (node.g, node.score) > (best_partial.g, best_partial.score):
+                best_partial = node
+            if f == float('inf'):
+                continue # A dead end: kept as a partial plan, never expanded
+            if not budget.charge():
+                break
+
+            piece_name, piece = current_state.next_piece()
+            actions = self._actions(current_state, piece)
+            self.stats.record_expansion(node.g, len(actions))
+            if self._on_expand is not None:
+                self._on_expand(current_state, node.g)
 
             for row, col in actions:
-                successor = current_state.generate_successor(piece, row, col)
-                new_g = g + 1
-                h = heuristic(successor)
-                new_f = new_g + h
-                new_path = path + [(piece_name, row, col)]
+                successor, score_increase = self._successor(current_state, piece, row, col)
+                new_g = node.g + 1
+                h = remaining_moves(successor)
+                if h == float('inf') or dead_regions.is_doomed(successor.bitboard, new_g):
+                    h = float('inf')
+                    self.stats.dead_ends += 1
+                new_score = node.score + score_increase
+                # Dead ends stay in the queue behind every live node, so they are only popped as partial plans
+                tie_break = new_score + self.heuristic(successor) if h != float('inf') else new_score
                 counter += 1 # Increment counter
-                heapq.heappush(priority_queue, (new_f, new_g, counter, successor, new_path)) # Add counter
+                heapq.heappush(priority_queue, (new_g + h, -tie_break, counter, SearchNode(
+                    successor, node, pack_action(node.g, row, col), new_g, new_score))) # Add counter
+            node.state = None # Expanded: only the path back to the root is still needed
+            self.stats.record_frontier(len(priority_queue))
 
-        return None
+        return self._finish_partial(best_partial.path(pieces), best_partial.score)
 
-class BreadthFirstSearch(SearchAlgorithm):
-    def search(self, initial_state):
+class BreadthFirstSearch(RootSplitSearch):
+    optimal = True # Exhaustive: every complete plan is compared
+
+    def _search(self, initial_state):
         """
         Performs Breadth-First Search to find a solution that maximizes score (specifically diamonds collected).
-        Modified to use TreeNode for state representation and path tracking.
+        Each queued node carries the score accumulated along its path; the transposition table keeps the best
+        score seen for every (board, piece index) so a position is only re-queued when reached with a higher score.
+        Successors that DeadRegionAnalyzer shows can never be completed are not queued.
         """
-        root_node = TreeNode(initial_state) # Create root TreeNode
-        queue = deque([(root_node, [])])  # Queue of (TreeNode, path_to_node) - MODIFIED to use TreeNode
-        visited = {self._board_to_tuple(initial_state.board)} # Keep track of visited board states
-        best_score_solution = None
-        max_score_reached = -1 # Initialize with a score lower than any possible score
+        budget = self._begin()
+        pieces = initial_state.remaining_pieces
+        dead_regions = DeadRegionAnalyzer(pieces, initial_state.bitboard.rows, initial_state.bitboard.cols)
+        root_node = SearchNode(initial_state) # Create root node
+        queue = deque([root_node])  # Queue of SearchNodes, each carrying its accumulated score
+        table = self._reset_table() # Best score found per (board, piece index)
+        table.store(initial_state.zobrist_hash, initial_state.pieces_left, 0, LOWER_BOUND)
+        best_goal = None # Goal node with the highest score found
+        best_partial = root_node # Deepest (then highest-scoring) node expanded so far
 
         while queue:
-            current_node, path = queue.popleft() # Get TreeNode from queue - MODIFIED
-            current_state = current_node.state # Access GameState from TreeNode - MODIFIED
+            current_node = queue.popleft()
+            current_state = current_node.state
+            accumulated_score = current_node.score
 
             if current_state.is_goal():
-                accumulated_score = self._calculate_score_from_path(initial_state, path) # Calculate score for the path
-                if accumulated_score > max_score_reached: # Found a better score
-                    max_score_reached = accumulated_score
-                    best_score_solution = path
+                if best_goal is None or accumulated_score > best_goal.score: # Found a better score
+                    best_goal = current_node
+                    if self._on_goal is not None:
+                        self._goal(current_node.path(pieces), accumulated_score)
+                current_node.state = None
                 continue # Continue searching for potentially better solutions
 
-            piece_name, piece = current_state.remaining_pieces[0]
-            possible_actions = current_state.get_possible_actions(piece)
+            entry = self._probe(current_state.zobrist_hash)
+            if entry is not None and entry.score > accumulated_score:
+                self.stats.duplicates += 1
+                current_node.state = None
+                continue # The same position was queued again later with a higher score
+
+            if (current_node.g, accumulated_score) > (best_partial.g, best_partial.score):
+                best_partial = current_node
+            if not budget.charge():
+                break
+
+            piece_name, piece = current_state.next_piece()
+            possible_actions = self._actions(current_state, piece)
+            self.stats.record_expansion(current_node.g, len(possible_actions))
+            if self._on_expand is not None:
+                self._on_expand(current_state, current_node.g)
 
             # Evaluate each action and add to queue, prioritize by score
             scored_actions = [] # List to hold (score, action) tuples
             for row, col in possible_actions:
-                successor_state, score_increase = current_state.generate_successor_with_score(piece, row, col) # Get state and score
-                scored_actions.append((score_increase, (successor_state, row, col, (row, col)))) # Include move (row, col) in scored_actions
+                successor_state, score_increase = self._successor(current_state, piece, row, col) # Get state and score
+                scored_actions.append((score_increase, (successor_state, row, col)))
 
             # Sort actions by score in descending order (higher score first)
             scored_actions.sort(key=lambda item: item[0], reverse=True)
 
-            for score_increase, (successor_state, row, col, move_coords) in scored_actions: # Unpack move_coords
-                successor_board_tuple = self._board_to_tuple(successor_state.board)
+            for score_increase, (successor_state, row, col) in scored_actions:
+                successor_score = accumulated_score + score_increase
+                entry = self._probe(successor_state.zobrist_hash)
 
-                if successor_board_tuple not in visited:
-                    visited.add(successor_board_tuple)
-                    # Store the action (move_coords) when creating the child TreeNode:
-                    child_node = TreeNode(successor_state, parent=current_node, action=(piece_name, move_coords[0], move_coords[1])) # Store action
-                    new_path = path + [(piece_name, move_coords[0], move_coords[1])] # Append move coords to path
-                    queue.append((child_node, new_path)) # Queue TreeNode and updated path - MODIFIED
+                if entry is not None and entry.score >= successor_score:
+                    self.stats.duplicates += 1
+                elif dead_regions.is_doomed(successor_state.bitboard, current_node.g + 1):
+                    self.stats.dead_ends += 1
+                else:
+                    self._store(successor_state.zobrist_hash, successor_state.pieces_left, successor_score, LOWER_BOUND)
+                    queue.append(SearchNode(successor_state, current_node, pack_action(current_node.g, row, col),
+                                            current_node.g + 1, successor_score))
+            current_node.state = None # Expanded: only the path back to the root is still needed
+            self.stats.record_frontier(len(queue))
 
-        return best_score_solution # Return the path that led to the best score found
+        if best_goal is not None: # Return the path that led to the best score found
+            return self._finish(best_goal.path(pieces), best_goal.score, True)
+        return self._finish_partial(best_partial.path(pieces), best_partial.score)
 
 
-    def _board_to_tuple(self, board):
+class ScoreBound:
+    """
+    Optimistic bound on the points the pieces still to place can earn, used to prune in branch and bound.
+
+    Only lines that can still complete are counted. The first line to clear must be one of
+    DeadRegionAnalyzer.live_lines(); if there is none, nothing more can be earned. Otherwise a row that
+    misses k cells needs k cells of the pieces, and each cell fills one row and one column, so the cheapest
+    rows and the cheapest columns within the cells of the pieces are counted (a line cleared again later needs a
+    full line of cells). A piece adds at most its widest row to a row, and its tallest column to a column, so a
+    line missing more cells than the pieces can add that way is left out. A piece also completes at most
+    height + width lines.
+    Diamonds are capped by those on the pieces plus those lying in a line that can complete.
+    """
+
+    def __init__(self, pieces, rows, cols):
         """
-        Helper function to convert a board (list of lists) to a tuple of tuples for hashability.
+        Args:
+            pieces (list): The (piece_name, shape) pairs still to place, in order.
+            rows (int): The number of rows on the board.
+            cols (int): The number of columns on the board.
         """
-        return tuple(tuple(row) for row in board)
+        self.rows = rows
+        self.cols = cols
+        self.row_masks, self.col_masks = line_masks(rows, cols)
+        # Suffix sums over the pieces: entry i covers pieces[i:]
+        self.lines = [0] * (len(pieces) + 1)
+        self.cells = [0] * (len(pieces) + 1)
+        self.diamonds = [0] * (len(pieces) + 1)
+        self.row_cells = [0] * (len(pieces) + 1) # Most cells the pieces can add to one row
+        self.col_cells = [0] * (len(pieces) + 1) # Most cells the pieces can add to one column
+        for i in range(len(pieces) - 1, -1, -1):
+            _, piece = pieces[i]
+            self.lines[i] = self.lines[i + 1] + len(piece) + len(piece[0])
+            self.row_cells[i] = self.row_cells[i + 1] + max(sum(1 for cell in row if cell) for row in piece)
+            self.col_cells[i] = self.col_cells[i + 1] + max(sum(1 for cell in col if cell) for col in zip(*piece))
+            self.cells[i] = self.cells[i + 1] + sum(1 for row in piece for cell in row if cell)
+            self.diamonds[i] = self.diamonds[i + 1] + sum(row.count(2) for row in piece)
 
-    def _calculate_score_from_path(self, initial_state, path):
-        """Calculates the total score for a given path of moves."""
-        current_state = copy.deepcopy(initial_state)
-        total_score = 0
-        for piece_name, row, col in path:
-            piece = current_state.piece_definitions[piece_name] # Assuming piece_definitions is accessible
-            successor_state, score_increase = current_state.generate_successor_with_score(piece, row, col)
-            total_score += score_increase
-            current_state = successor_state  # Move to the next state
-        return total_score
+    def gain(self, bitboard, depth, depth_limit, dead_regions):
+        """
+        Upper bound on the points earned by placing pieces[depth:depth_limit] on the board.
+
+        Args:
+            dead_regions (DeadRegionAnalyzer): Analyzer built for pieces[:depth_limit].
+        """
+        if not dead_regions.live_lines(bitboard, depth, first_only=True):
+            return 0 # No line can ever clear again
+        cells = self.cells[depth] - self.cells[depth_limit]
+        row_cells = min(cells, self.row_cells[depth] - self.row_cells[depth_limit])
+        col_cells = min(cells, self.col_cells[depth] - self.col_cells[depth_limit])
+        filled = bitboard.filled
+        reachable = 0 # Union of the lines that can complete
+        row_costs = []
+        for mask in self.row_masks:
+            missing = self.cols - (filled & mask).bit_count()
+            if missing <= row_cells:
+                row_costs.append(missing)
+                reachable |= mask
+        col_costs = []
+        for mask in self.col_masks:
+            missing = self.rows - (filled & mask).bit_count()
+            if missing <= col_cells:
+                col_costs.append(missing)
+                reachable |= mask
+        lines = min(self.lines[depth] - self.lines[depth_limit],
+                    self._max_clears(row_costs, self.cols, cells) + self._max_clears(col_costs, self.rows, cells))
+        diamonds = min((bitboard.diamonds & reachable).bit_count() + self.diamonds[depth] - self.diamonds[depth_limit],
+                       lines * max(self.rows, self.cols))
+        return rules.move_score(lines, diamonds)
+
+    @staticmethod
+    def _max_clears(costs, line_length, cells):
+        """Most clears of parallel lines the cells can pay for, cheapest first, then whole lines again."""
+        clears = 0
+        for cost in sorted(costs):
+            if cost > cells:
+                break
+            cells -= cost
+            clears += 1
+        return clears + cells // line_length if clears else 0
 
 
 class DFSearch(SearchAlgorithm): # Depth First Search algorithm
+    def __init__(self, branch_and_bound=False, iterative_deepening=False, transposition_table=None,
+                 time_limit=None, node_limit=None, hooks=None, profile=False):
+        """
+        Args:
+            branch_and_bound (bool): If False, return the first complete solution found.
+                If True, keep searching for the highest-scoring solution and prune subtrees whose
+                optimistic score (see ScoreBound) cannot beat the best solution found so far; placements that
+                clear the most lines are then tried first, so good solutions are found early.
+            iterative_deepening (bool): If True, search to depth 1, 2, ... in turn, so that when the budget runs
+                out the plan of the deepest fully searched depth is available.
+            transposition_table, time_limit, node_limit, hooks, profile: See SearchAlgorithm. on_expand receives
+                the single board the search mutates in place.
+        """
+        super().__init__(transposition_table, time_limit, node_limit, hooks, profile)
+        self.branch_and_bound = branch_and_bound
+        self.iterative_deepening = iterative_deepening
+
+    @property
+    def optimal(self):
+        return self.branch_and_bound
+
+    @property
+    def solver(self):
+        options = [name for name, enabled in (("branch_and_bound", self.branch_and_bound),
+                                              ("iterative_deepening", self.iterative_deepening)) if enabled]
+        return f"DFSearch({', '.join(options)})" if options else "DFSearch"
+
     def search(self, initial_state):
         """
         Performs Depth-First Search to find a solution.
-        This implementation now correctly reconstructs the path using actions stored in TreeNodes.
+        A single board is mutated in place with apply/undo, so no board is allocated per node and memory
+        only grows with the search depth.
         Note: Basic DFS is NOT designed to find optimal solutions in terms of score for this game.
-        It finds *a* solution quickly, but not necessarily the best one. For score optimization, BFS is more suitable.
+        It finds *a* solution quickly, but not necessarily the best one. Use branch_and_bound=True for score optimization.
         """
-        root_node = TreeNode(initial_state)
-        stack = [root_node] # Use list as stack for DFS - LIFO, replacing deque for simplicity in DFS
-        visited = set([self._board_to_tuple(initial_state.board)]) # Visited states to prevent loops
-        solution_path = None # Store solution path here
+        budget = self._begin()
+        state = initial_state.copy()
+        pieces = state.remaining_pieces
+        if not pieces:
+            return self._finish([], 0, True)
+
+        bound = ScoreBound(pieces, state.bitboard.rows, state.bitboard.cols)
+        depth_limits = range(1, len(pieces) + 1) if self.iterative_deepening else [len(pieces)]
+        best_plan = ([], 0) # Deepest (then highest-scoring) plan or partial plan found so far
+        for depth_limit in depth_limits:
+            solution, partial = self._depth_limited_search(state, pieces, depth_limit, bound, budget)
+            for candidate in (solution, partial):
+                if candidate is not None and (len(candidate[0]), candidate[1]) > (len(best_plan[0]), best_plan[1]):
+                    best_plan = candidate
+            if solution is None or budget.exhausted:
+                break # No plan reaches this depth (so no deeper one exists either), or the budget ran out
+
+        if len(best_plan[0]) == len(pieces):
+            return self._finish(best_plan[0], best_plan[1], True)
+        return self._finish_partial(*best_plan)
+
+    def _depth_limited_search(self, state, pieces, depth_limit, bound, budget):
+        """
+        Runs one depth-first pass that places the first depth_limit pieces, mutating state in place and
+        restoring it before returning.
+
+        Returns:
+            tuple: (solution, best_partial) where solution is (path, score) of the best plan reaching depth_limit,
+            or None, and best_partial is the deepest (then highest-scoring) (path, score) seen.
+        """
+        path = [] # Actions leading to the current board
+        records = [] # MoveRecords used to undo the actions in path
+        stack = [] # One placement iterator per depth
+        self._reset_table().store(state.zobrist_hash, state.pieces_left, 0, LOWER_BOUND) # Best score per position
+        score = 0
+        best_score = -1
+        solution_path = None
+        best_partial = ([], 0)
+        dead_regions = DeadRegionAnalyzer(pieces[:depth_limit], state.bitboard.rows, state.bitboard.cols)
+        if budget.charge():
+            stack.append(self._expand(state, pieces[0][1], 0))
 
         while stack:
-            current_node = stack.pop() # Pop from stack (LIFO for DFS)
-            current_state = current_node.state
+            depth = len(path)
+            placement = next(stack[-1], None)
+            if placement is None: # Every placement at this depth is explored: backtrack
+                stack.pop()
+                if records:
+                    record = records.pop()
+                    state.undo_move(record)
+                    score -= record.score
+                    path.pop()
+                continue
 
-            if current_state.is_goal():
-                solution_path = self._reconstruct_path(current_node) # Reconstruct path upon finding goal
-                break # Stop searching once a solution is found (DFS finds first solution, not necessarily optimal)
+            record = self._apply(state, placement)
+            new_score = score + record.score
+            entry = self._probe(state.zobrist_hash)
+            if entry is not None and (not self.branch_and_bound or entry.score >= new_score):
+                self.stats.duplicates += 1
+                state.undo_move(record)
+                continue
+            self._store(state.zobrist_hash, state.pieces_left, new_score, LOWER_BOUND)
 
-            piece_name, piece = current_state.remaining_pieces[0]
-            possible_actions = current_state.get_possible_actions(piece)
+            path.append((pieces[depth][0], placement.row, placement.col))
+            self.stats.max_depth = max(self.stats.max_depth, depth + 1)
+            if (depth + 1, new_score) > (len(best_partial[0]), best_partial[1]):
+                best_partial = (list(path), new_score)
+            if depth + 1 == depth_limit: # Goal: every piece up to the limit placed
+                if new_score > best_score:
+                    best_score = new_score
+                    solution_path = list(path)
+                    if depth_limit == len(pieces):
+                        self._goal(solution_path, best_score)
+                state.undo_move(record)
+                path.pop()
+                if not self.branch_and_bound:
+                    break # Stop at the first solution (DFS finds first solution, not necessarily optimal)
+                continue
 
-            for row, col in possible_actions:
-                successor_state = current_state.generate_successor(piece, row, col)
-                successor_board_tuple = self._board_to_tuple(successor_state.board)
+            if dead_regions.is_doomed(state.bitboard, depth + 1):
+                self.stats.dead_ends += 1
+                state.undo_move(record) # The remaining pieces can never all be placed
+                path.pop()
+                continue
 
-                if successor_board_tuple not in visited:
-                    visited.add(successor_board_tuple)
-                    # Store the action (row, col) in the TreeNode
-                    child_node = TreeNode(state=successor_state, parent=current_node, action=(piece_name, row, col))
-                    current_node.add_child(child_node)
-                    stack.append(child_node)
+            if self.branch_and_bound:
+                if new_score + bound.gain(state.bitboard, depth + 1, depth_limit, dead_regions) <= best_score:
+                    state.undo_move(record) # Even the optimistic bound cannot beat the best solution
+                    path.pop()
+                    continue
 
-        return solution_path # Return the solution path found by DFS (or None if no solution)
+            if not budget.charge():
+                state.undo_move(record)
+                path.pop()
+                break
+            records.append(record)
+            score = new_score
+            stack.append(self._expand(state, pieces[depth + 1][1], depth + 1))
 
+        while records: # Restore the board for the next pass
+            state.undo_move(records.pop())
 
-    def _board_to_tuple(self, board):
-        """Helper function to convert a board to a hashable tuple."""
-        return tuple(tuple(row) for row in board)
+        if solution_path is None:
+            return None, best_partial
+        return (solution_path, best_score), best_partial
 
-    def _reconstruct_path(self, node):
-        """Reconstructs the path from the goal node back to the root, using stored actions."""
-        path = []
-        current_node = node
-        while current_node.parent is not None:
-            if current_node.action: # Check if action is not None (for root node, action is None)
-                path.insert(0, current_node.action) # Insert action at the beginning of path
-            current_node = current_node.parent
-        return path
+    def _expand(self, state, piece, depth):
+        """
+        Expands the board at the given depth: records the expansion and returns an iterator over the legal
+        placements of the piece, last one first, matching the order of a LIFO stack.
+        """
+        placements = self._legal_placements(state, piece)
+        if self.branch_and_bound:
+            filled = state.bitboard.filled
+            # Stable sort, ascending: after reversal the placements completing the most lines come first
+            placements.sort(key=lambda p: sum(1 for line in p.lines if (filled | p.occupancy) & line == line))
+        self.stats.record_expansion(depth, len(placements))
+        self.stats.record_frontier(depth + 1)
+        if self._on_expand is not None:
+            self._on_expand(state, depth)
+        return reversed(placements)
+
+
+class BranchAndBoundSearch(DFSearch):
+    def __init__(self, transposition_table=None, time_limit=None, node_limit=None, hooks=None, profile=False):
+        """
+        Depth-first branch and bound: finds the highest-scoring complete plan.
+
+        Each node carries the score earned on its path; subtrees whose score plus ScoreBound's optimistic gain
+        cannot beat the best plan found so far are pruned. The board is searched in place, so memory only grows
+        with the sequence length. Same as DFSearch(branch_and_bound=True).
+
+        Args:
+            transposition_table, time_limit, node_limit, hooks, profile: See DFSearch.
+        """
+        super().__init__(True, False, transposition_table, time_limit, node_limit, hooks, profile)
+
+
+def beam_score(state, accumulated_score):
+    """
+    Default BeamSearch scoring function: the score earned so far plus the number of empty cells,
+    since an open board keeps more placements (and future line clears) available to the remaining pieces.
+    """
+    return accumulated_score + state.bitboard.count_empty()
+
+
+class BeamSearch(SearchAlgorithm):
+    def __init__(self, beam_width=64, scoring_function=None, transposition_table=None, time_limit=None,
+                 node_limit=None, hooks=None, profile=False):
+        """
+        Args:
+            beam_width (int): Number of states kept at each depth.
+            scoring_function (callable, optional): f(state, accumulated_score) -> number used to rank states;
+                higher is better. Defaults to beam_score.
+            transposition_table, time_limit, node_limit, hooks, profile: See SearchAlgorithm.
+        """
+        super().__init__(transposition_table, time_limit, node_limit, hooks, profile)
+        self.beam_width = beam_width
+        self.scoring_function = scoring_function if scoring_function is not None else beam_score
+
+    def search(self, initial_state):
+        """
+        Performs Beam Search for a high-scoring solution.
+        Every depth expands all states in the beam and keeps only the beam_width best successors, so memory and
+        time grow linearly with the sequence length. The best complete plan by accumulated score is returned.
+        """
+        budget = self._begin()
+        self._reset_table() # Best score seen per (board, piece index), drops duplicates inside a layer
+        beam = [(0, initial_state, [])] # (accumulated_score, state, path)
+        counter = 0 # Counter to break ties between equally ranked states
+
+        while beam and not beam[0][1].is_goal():
+            candidates = []
+            for accumulated_score, current_state, path in beam:
+                if not budget.charge():
+                    break
+                piece_name, piece = current_state.next_piece()
+                actions = self._actions(current_state, piece)
+                self.stats.record_expansion(len(path), len(actions))
+                if self._on_expand is not None:
+                    self._on_expand(current_state, len(path))
+                for row, col in actions:
+                    successor_state, score_increase = self._successor(current_state, piece, row, col)
+                    successor_score = accumulated_score + score_increase
+                    entry = self._probe(successor_state.zobrist_hash)
+                    if entry is not None and entry.score >= successor_score:
+                        self.stats.duplicates += 1
+                        continue
+                    self._store(successor_state.zobrist_hash, successor_state.pieces_left, successor_score, LOWER_BOUND)
+                    counter += 1
+                    candidates.append((self.scoring_function(successor_state, successor_score), -counter,
+                                       successor_score, successor_state, path + [(piece_name, row, col)]))
+                self.stats.record_frontier(len(candidates))
+            if budget.exhausted:
+                break # Keep the last full layer; a half-expanded one would be biased towards the first states
+
+            best = heapq.nlargest(self.beam_width, candidates)
+            beam = [(successor_score, state, path) for _, _, successor_score, state, path in best]
+            self.stats.max_depth = max(self.stats.max_depth, len(beam[0][2]) if beam else 0)
+
+        if not beam:
+            return self._finish_partial(None, None) # Every state in the beam ran out of moves
+        best_score, best_state, best_path = max(beam, key=lambda item: item[0]) # The highest-scoring plan
+        if best_state.is_goal():
+            self._goal(best_path, best_score)
+            return self._finish(best_path, best_score, True)
+        return self._finish_partial(best_path, best_score)
+
+
+def _mcts_rollout(rows, cols, filled, diamonds, pieces, policy, seed):
+    """
+    Plays the remaining pieces from a position with a fast rollout policy.
+
+    Module-level so it can run in a worker process; only plain ints and piece tuples are passed in.
+
+    Args:
+        rows, cols (int): Board size.
+        filled, diamonds (int): Bit masks of the position.
+        pieces (tuple): Remaining (piece_name, shape) pairs.
+        policy (str): "random" picks any legal placement; "greedy" picks the one scoring the most points now.
+        seed (int): Seed for the rollout's random choices.
+
+    Returns:
+        tuple: (score, moves) with the points earned and the (piece_name, row, col) moves played.
+    """
+    rng = random.Random(seed)
+    board = BitBoard(rows, cols, filled, diamonds)
+    placement_index = get_placement_index(rows, cols)
+    score = 0
+    moves = []
+    for piece_name, piece in pieces:
+        placements = placement_index.legal_placements(piece, board.filled)
+        if not placements:
+            break
+        if policy == "greedy":
+            best_gain = -1
+            best_placements = []
+            for placement in placements:
+                cleared, cleared_diamonds, _, gain = rules.apply_placement(board, placement)
+                board.undo(placement.occupancy, placement.diamonds, cleared, cleared_diamonds)
+                if gain > best_gain:
+                    best_gain = gain
+                    best_placements = [placement]
+                elif gain == best_gain:
+                    best_placements.append(placement)
+            placement = rng.choice(best_placements)
+        else:
+            placement = rng.choice(placements)
+        score += rules.apply_placement(board, placement)[3]
+        moves.append((piece_name, placement.row, placement.col))
+    return score, moves
+
+
+class MCTSNode:
+    """Node of the Monte Carlo search tree."""
+    __slots__ = ("state", "parent", "action", "path_score", "children", "untried_actions", "visits", "total_reward")
+
+    def __init__(self, state, parent=None, action=None, path_score=0):
+        """
+        Args:
+            state (GameState): The game state represented by this node.
+            parent (MCTSNode, optional): The parent node, None for the root.
+            action (tuple, optional): The (piece_name, row, col) move that led here from the parent.
+            path_score (int): Points earned by the moves from the root to this node.
+        """
+        self.state = state
+        self.parent = parent
+        self.action = action
+        self.path_score = path_score
+        self.children = []
+        self.untried_actions = state.get_possible_actions(state.next_piece()[1]) if not state.is_goal() else []
+        self.visits = 0
+        self.total_reward = 0.0
+
+
+class MonteCarloTreeSearch(SearchAlgorithm):
+    def __init__(self, iterations=1000, exploration=1.4, rollout_policy="random", workers=1, batch_size=None,
+                 seed=None, time_limit=None, node_limit=None, hooks=None, profile=False):
+        """
+        Args:
+            iterations (int): Number of rollouts to run (the time and node limits can stop it earlier).
+            exploration (float): UCT exploration constant.
+            rollout_policy (str): "random" or "greedy"; see _mcts_rollout.
+            workers (int): Rollouts run in parallel in this many processes; 1 runs them in this process,
+                None uses every CPU.
+            batch_size (int, optional): Leaves selected per round of parallel rollouts. Defaults to 4 per worker.
+            seed (int, optional): Seed for reproducible rollouts.
+            time_limit, node_limit, hooks, profile: See SearchAlgorithm. Every selected leaf counts as an
+                expansion; rollouts are not profiled. The tree keeps one node per path, so no transposition table
+                is used.
+        """
+        super().__init__(None, time_limit, node_limit, hooks, profile)
+        if rollout_policy not in ("random", "greedy"):
+            raise ValueError(f"Unknown rollout policy: {rollout_policy}")
+        self.iterations = iterations
+        self.exploration = exploration
+        self.rollout_policy = rollout_policy
+        self.workers = workers if workers is not None else os.cpu_count()
+        self.batch_size = batch_size if batch_size is not None else 4 * self.workers
+        self.seed = seed
+
+    def search(self, initial_state):
+        """
+        Performs Monte Carlo Tree Search with UCT selection over the placements of each piece.
+        Rollouts are sent to a process pool in batches of batch_size leaves; virtual visits keep the leaves of one
+        batch apart. The best plan seen in any rollout (tree moves followed by rollout moves) is returned.
+        """
+        budget = self._begin()
+        if initial_state.is_goal():
+            return self._finish([], 0, True)
+        rng = random.Random(self.seed)
+        root = MCTSNode(initial_state)
+        total_pieces = initial_state.pieces_left
+        self._best = ([], 0) # Best (path, score): most pieces placed, then highest score
+        self._score_scale = 10 # Highest score seen, used to normalize rewards to [0, 1]
+
+        if self.workers > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                self._run_iterations(root, total_pieces, budget, rng, executor)
+        else:
+            self._run_iterations(root, total_pieces, budget, rng, None)
+
+        path, score = self._best
+        if len(path) == total_pieces:
+            return self._finish(path, score, True)
+        return self._finish_partial(path, score)
+
+    def _run_iterations(self, root, total_pieces, budget, rng, executor):
+        """Runs selection, expansion, rollout and backpropagation until the iteration count or budget is spent."""
+        batch_size = self.batch_size if executor is not None else 1
+        iterations = 0
+        while iterations < self.iterations and not budget.exhausted:
+            leaves = []
+            for _ in range(min(batch_size, self.iterations - iterations)):
+                if not budget.charge():
+                    break
+                leaf = self._select_and_expand(root)
+                node = leaf
+                while node is not None: # Virtual visit so the rest of the batch explores elsewhere
+                    node.visits += 1
+                    node = node.parent
+                leaves.append(leaf)
+            if not leaves:
+                break
+            iterations += len(leaves)
+
+            jobs = [(leaf.state.bitboard.rows, leaf.state.bitboard.cols, leaf.state.bitboard.filled,
+                     leaf.state.bitboard.diamonds, leaf.state.remaining_pieces, self.rollout_policy,
+                     rng.getrandbits(32)) for leaf in leaves]
+            if executor is not None:
+                outcomes = list(executor.map(_mcts_rollout, *zip(*jobs), chunksize=max(1, len(jobs) // self.workers)))
+            else:
+                outcomes = [_mcts_rollout(*job) for job in jobs]
+
+            for leaf, (rollout_score, rollout_moves) in zip(leaves, outcomes):
+                self._backpropagate(leaf, rollout_score, rollout_moves, total_pieces)
+
+    def _select_and_expand(self, root):
+        """Descends by UCT while nodes are fully expanded, then expands one untried action."""
+        node = root
+        while not node.untried_actions and node.children:
+            log_visits = math.log(node.visits + 1)
+            node = max(node.children, key=lambda child: self._uct(child, log_visits))
+        depth = root.state.pieces_left - node.state.pieces_left
+        if self._on_expand is not None:
+            self._on_expand(node.state, depth)
+        if not node.untried_actions:
+            self.stats.record_expansion(depth, 0) # A terminal node: roll out from it again
+            return node
+        row, col = node.untried_actions.pop()
+        piece_name, piece = node.state.next_piece()
+        successor, score_increase = self._successor(node.state, piece, row, col)
+        child = MCTSNode(successor, node, (piece_name, row, col), node.path_score + score_increase)
+        node.children.append(child)
+        self.stats.record_expansion(depth, 1)
+        self.stats.max_depth = max(self.stats.max_depth, depth + 1)
+        return child
+
+    def _uct(self, child, log_parent_visits):
+        """Upper confidence bound of a child: mean normalized reward plus the exploration term."""
+        if child.visits == 0:
+            return float('inf')
+        return child.total_reward / child.visits + self.exploration * math.sqrt(log_parent_visits / child.visits)
+
+    def _backpropagate(self, leaf, rollout_score, rollout_moves, total_pieces):
+        """Adds the rollout's reward to every node from the leaf up to the root and records the best plan."""
+        tree_moves = []
+        node = leaf
+        while node.parent is not None:
+            tree_moves.append(node.action)
+            node = node.parent
+        tree_moves.reverse()
+        path = tree_moves + rollout_moves
+        score = leaf.path_score + rollout_score
+        if (len(path), score) > (len(self._best[0]), self._best[1]):
+            self._best = (path, score)
+            if len(path) == total_pieces:
+                self._goal(path, score)
+        self._score_scale = max(self._score_scale, score)
+
+        # Reward in [0, 2]: share of the sequence placed plus normalized score
+        reward = len(path) / total_pieces + score / self._score_scale
+        node = leaf
+        while node is not None: # Visits were already counted when the leaf was selected
+            node.total_reward += reward
+            node = node.parent
 
 
 # Random AI player (for comparison or as a baseline)
@@ -211,78 +1043,132 @@ class AIPlayer:
 
     def play_step(self):
         """Plays one step using random valid move."""
+        move = self.choose_move()
+        if move is None:
+            return None
+        piece_name, row, col = move
+        return self.game_controller.play(row, col)
+
+    def choose_move(self):
+        """Returns the (piece_name, row, col) move to play next without playing it, or None if there is none."""
         piece_name, piece = self.game_controller.piece_sequence.peek_next_piece()
         possible_moves = self._find_possible_moves(piece)
         if possible_moves:
             row, col = possible_moves[0] # Choose the first valid move (which is random due to move order)
-            return self.game_controller.play(row, col)
+            return piece_name, row, col
         return None
 
     def _find_possible_moves(self, piece):
         """Finds all possible valid positions."""
-        possible_positions = []
-        piece_rows, piece_cols = len(piece), len(piece[0])
-        for r in range(self.game_controller.game_board.rows):
-            for c in range(self.game_controller.game_board.cols):
-                if self.game_controller.can_place_piece(piece, r, c):
-                    possible_positions.append((r, c))
+        possible_positions = [(p.row, p.col) for p in rules.legal_placements(self.game_controller.bitboard, piece)]
         return possible_positions
 
 
-# BFS AI Player - using the score-maximizing BFS algorithm
-class BFS_AIPlayer:
-    """AI player using Breadth-First Search for score maximization."""
-    def __init__(self, game_controller, search_algorithm=None): # Inject search algorithm
+# Base class of the AI players that plan with a SearchAlgorithm
+class PlanningAIPlayer:
+    """
+    AI player that searches for a plan and replays it over the following turns.
+
+    Before each move of a cached plan, the live board, the number of pieces left and the next piece are
+    compared with what the plan expected. A new search only runs when the plan is used up or the game has
+    diverged from it (for example after a manual move).
+
+    With a SolutionCache, a position whose plan is stored is played from the cache without searching, and every
+    complete plan found is stored for later games.
+    """
+    default_search_algorithm = None # Subclasses name the SearchAlgorithm class used by default
+
+    def __init__(self, game_controller, search_algorithm=None, reuse_plan=True,
+                 solution_cache=None): # Inject search algorithm
         self.game_controller = game_controller
-        self.search_algorithm = search_algorithm if search_algorithm is not None else BreadthFirstSearch() # Default to BFS
+        self.search_algorithm = search_algorithm if search_algorithm is not None else self.default_search_algorithm()
+        self.reuse_plan = reuse_plan
+        self.solution_cache = solution_cache
+        self._plan = [] # Moves still to play from the latest search
+        self._expected = [] # (board key, pieces left, next piece) the live game should show before each move
 
     def play_step(self):
-        """Plays one step using the configured BFS algorithm to find the next move."""
+        """Plays one step, replaying the cached plan when it still matches the game or searching again otherwise."""
+        move = self.choose_move()
+        if move is None:
+            return None
+        piece_name, row, col = move
+        return self.game_controller.play(row, col)
+
+    def choose_move(self):
+        """
+        Returns the (piece_name, row, col) move to play next without playing it, or None if there is none.
+
+        Only reads the game, so it can run on a worker thread while the game is left untouched.
+        """
+        if not (self.reuse_plan and self._plan and self._plan_matches()):
+            self._plan_from_search()
+        if not self._plan:
+            return None
+        self._expected.pop(0)
+        return self._plan.pop(0)
+
+    def cancel(self):
+        """Stops a search running in choose_move() on another thread; see SearchAlgorithm.cancel()."""
+        self.search_algorithm.cancel()
+
+    @property
+    def last_stats(self):
+        """SearchStats of the latest search, or None before the first one."""
+        if self.search_algorithm.last_result is None:
+            return None
+        return self.search_algorithm.last_result.stats
+
+    def reset_plan(self):
+        """Drops the cached plan so the next step searches again."""
+        self._plan = []
+        self._expected = []
+
+    def _plan_matches(self):
+        """Checks that the live game is in the position the next planned move expects."""
+        board_key, pieces_left, next_piece = self._expected[0]
+        sequence = self.game_controller.piece_sequence.sequence
+        return (self.game_controller.bitboard.key() == board_key and len(sequence) == pieces_left and
+                sequence[0] == next_piece)
+
+    def _plan_from_search(self):
+        """Searches from the live game and records the position expected before every move of the plan."""
         current_game_state = self.game_controller.get_game_state()
-        solution_path = self.search_algorithm.search(current_game_state)
+        solution_path = find_plan(self.search_algorithm, current_game_state, self.solution_cache)
+        self._plan = list(solution_path) if solution_path else []
+        self._expected = []
+        state = current_game_state
+        for piece_name, row, col in self._plan:
+            next_piece = state.next_piece()
+            self._expected.append((state.board_key(), state.pieces_left, next_piece))
+            state = state.generate_successor(next_piece[1], row, col)
+
+
+# BFS AI Player - using the score-maximizing BFS algorithm
+class BFS_AIPlayer(PlanningAIPlayer):
+    """AI player using Breadth-First Search for score maximization."""
+    default_search_algorithm = BreadthFirstSearch # Default to BFS
 
-        if solution_path:
-            next_move = solution_path[0]
-            piece_name, row, col = next_move
-            return self.game_controller.play(row, col)
-        return None
 
 # DF AI Player - using Depth-First Search algorithm
-class DF_AIPlayer:
+class DF_AIPlayer(PlanningAIPlayer):
     """AI player using Depth-First Search."""
-    def __init__(self, game_controller, search_algorithm=None): # Inject search algorithm
-        self.game_controller = game_controller
-        self.search_algorithm = search_algorithm if search_algorithm is not None else DFSearch() # Default to DFS
+    default_search_algorithm = DFSearch # Default to DFS
 
-    def play_step(self):
-        """Plays one step using the configured DFS algorithm to find the next move."""
-        current_game_state = self.game_controller.get_game_state()
-        solution_path = self.search_algorithm.search(current_game_state)
 
-        if solution_path:
-            next_move = solution_path[0]
-            piece_name, row, col = next_move
-            return self.game_controller.play(row, col)
-        return None
+# Beam AI Player - using the bounded Beam Search algorithm
+class Beam_AIPlayer(PlanningAIPlayer):
+    """AI player using Beam Search for score maximization with a bounded frontier."""
+    default_search_algorithm = BeamSearch # Default to Beam Search
 
 
-# TreeNode class - put it here as it's used by DFS and BFS and might be used by other search algos
-class TreeNode:
-    def __init__(self, state, parent=None, action=None):
-        """
-        TreeNode for search algorithms. Stores the game state, parent node, and the action taken to reach this state.
-
-        Args:
-            state (GameState): The game state represented by this node.
-            parent (TreeNode, optional): The parent node in the search tree. Defaults to None for the root node.
-            action (tuple, optional): The action (piece_name, row, col) that led to this state from the parent. Defaults to None for the root node.
-        """
-        self.state = state
-        self.parent = parent
-        self.children = []
-        self.action = action # Now storing the action!
+# MCTS AI Player - using Monte Carlo Tree Search with parallel rollouts
+class MCTS_AIPlayer(PlanningAIPlayer):
+    """
+    AI player using Monte Carlo Tree Search.
+    The tail of an MCTS plan comes from a single rollout, so by default it searches again on every turn.
+    """
+    default_search_algorithm = MonteCarloTreeSearch # Default to MCTS
 
-    def add_child(self, child_node):
-        """Adds a child node to this node."""
-        self.children.append(child_node)
-        child_node.parent = self
\ No newline at end of file
+    def __init__(self, game_controller, search_algorithm=None, reuse_plan=False, solution_cache=None):
+        super().__init__(game_controller, search_algorithm, reuse_plan, solution_cache)
@@ -0,0 +1,182 @@
+import time
+
+
+class SearchBudget:
+    """
+    Time and node limits for one search run.
+
+    Searches call charge() once per node they expand and stop as soon as it returns False.
+    cancel() stops a search early from another thread, e.g. a Cancel button in the GUI.
+    """
+
+    def __init__(self, time_limit=None, node_limit=None):
+        """
+        Args:
+            time_limit (float, optional): Seconds the search may run. None means no limit.
+            node_limit (int, optional): Number of node expansions allowed. None means no limit.
+        """
+        self.start_time = time.perf_counter()
+        self.deadline = self.start_time + time_limit if time_limit is not None else None
+        self.node_limit = node_limit
+        self.nodes = 0
+        self.exhausted = False
+        self.cancelled = False
+
+    def charge(self, nodes=1):
+        """
+        Accounts for expanded nodes.
+
+        Returns:
+            bool: True if the search may continue, False once the time or node limit is reached.
+        """
+        self.nodes += nodes
+        if self.cancelled:
+            self.exhausted = True
+        elif self.node_limit is not None and self.nodes > self.node_limit:
+            self.exhausted = True
+        elif self.deadline is not None and time.perf_counter() >= self.deadline:
+            self.exhausted = True
+        return not self.exhausted
+
+    def cancel(self):
+        """Makes the next charge() stop the search. Safe to call from another thread."""
+        self.cancelled = True
+
+    def elapsed(self):
+        """Seconds since the budget was created."""
+        return time.perf_counter() - self.start_time
+
+
+class SearchStats:
+    """
+    Statistics describing how far a search got and where its time went.
+    """
+
+    def __init__(self):
+        self.nodes_expanded = 0  # Nodes whose successors were generated
+        self.nodes_generated = 0  # Successor states created
+        self.duplicates = 0  # Successors dropped because the transposition table had already seen them
+        self.dead_ends = 0  # Successors dropped because dead-region analysis showed they cannot reach a goal
+        self.peak_frontier = 0  # Largest number of nodes waiting to be expanded at once
+        self.max_depth = 0  # Deepest number of pieces placed on any explored path
+        self.expanded_per_depth = []  # Nodes expanded at each depth
+        self.generated_per_depth = []  # Successors generated from the nodes of each depth
+        self.move_generation_time = 0.0  # Seconds listing legal placements (only measured when profiling)
+        self.successor_time = 0.0  # Seconds creating successor states (only measured when profiling)
+        self.hashing_time = 0.0  # Seconds probing and storing transposition table entries (only when profiling)
+        self.elapsed_time = 0.0  # Wall-clock seconds spent in the search
+        self.budget_exhausted = False  # True if the time or node limit stopped the search early
+
+    def record_expansion(self, depth, generated):
+        """
+        Accounts for one expanded node.
+
+        Args:
+            depth (int): Pieces placed on the path to the node.
+            generated (int): Successors generated from it.
+        """
+        self.nodes_expanded += 1
+        self.nodes_generated += generated
+        if depth >= len(self.expanded_per_depth):
+            extra = depth + 1 - len(self.expanded_per_depth)
+            self.expanded_per_depth.extend([0] * extra)
+            self.generated_per_depth.extend([0] * extra)
+        self.expanded_per_depth[depth] += 1
+        self.generated_per_depth[depth] += generated
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def record_frontier(self, size):
+        """Updates the peak frontier size."""
+        if size > self.peak_frontier:
+            self.peak_frontier = size
+
+    def branching_factors(self):
+        """Returns the average branching factor of the expanded nodes at each depth."""
+        return [generated / expanded if expanded else 0.0
+                for expanded, generated in zip(self.expanded_per_depth, self.generated_per_depth)]
+
+    def average_branching_factor(self):
+        """Returns the average branching factor over every expanded node."""
+        return self.nodes_generated / self.nodes_expanded if self.nodes_expanded else 0.0
+
+    def merge(self, other, depth_offset=0):
+        """
+        Adds the statistics of another run, e.g. a subtree searched in a worker process.
+
+        Args:
+            other (SearchStats): Statistics to add.
+            depth_offset (int): Depth of the other run's root in this search.
+        """
+        self.nodes_expanded += other.nodes_expanded
+        self.nodes_generated += other.nodes_generated
+        self.duplicates += other.duplicates
+        self.dead_ends += other.dead_ends
+        self.peak_frontier = max(self.peak_frontier, other.peak_frontier)
+        self.max_depth = max(self.max_depth, other.max_depth + depth_offset)
+        for depth, (expanded, generated) in enumerate(zip(other.expanded_per_depth, other.generated_per_depth)):
+            depth += depth_offset
+            if depth >= len(self.expanded_per_depth):
+                extra = depth + 1 - len(self.expanded_per_depth)
+                self.expanded_per_depth.extend([0] * extra)
+                self.generated_per_depth.extend([0] * extra)
+            self.expanded_per_depth[depth] += expanded
+            self.generated_per_depth[depth] += generated
+        self.move_generation_time += other.move_generation_time
+        self.successor_time += other.successor_time
+        self.hashing_time += other.hashing_time
+        self.budget_exhausted = self.budget_exhausted or other.budget_exhausted
+
+    def as_dict(self):
+        """Returns the statistics as a plain dict, e.g. for logging or JSON output."""
+        stats = dict(vars(self))
+        stats["branching_factors"] = self.branching_factors()
+        stats["average_branching_factor"] = self.average_branching_factor()
+        return stats
+
+    def __repr__(self):
+        return (f"SearchStats(nodes_expanded={self.nodes_expanded}, nodes_generated={self.nodes_generated}, "
+                f"duplicates={self.duplicates}, dead_ends={self.dead_ends}, peak_frontier={self.peak_frontier}, "
+                f"max_depth={self.max_depth}, elapsed_time={self.elapsed_time:.4f}, "
+                f"budget_exhausted={self.budget_exhausted})")
+
+
+class SearchHooks:
+    """
+    Callbacks a search calls while it runs, e.g. to log or visualize its progress.
+
+    Callbacks run inside the search loop, so they should be quick. Searches that work on one board in place
+    (DFSearch) pass that board, so a callback must not keep the state it receives.
+    """
+
+    def __init__(self, on_expand=None, on_goal=None):
+        """
+        Args:
+            on_expand (callable, optional): f(state, depth), called for every expanded node.
+            on_goal (callable, optional): f(path, score), called whenever a better complete plan is found.
+        """
+        self.on_expand = on_expand
+        self.on_goal = on_goal
+
+
+class SearchResult:
+    """
+    Outcome of one search: the best plan found and the statistics of the run.
+    """
+
+    def __init__(self, path, score, complete, stats):
+        """
+        Args:
+            path (list): The best plan found, as (piece_name, row, col) moves, or None if there is none.
+            score (int): Score the plan earns, or None if the algorithm does not track score.
+            complete (bool): True if the plan places every remaining piece.
+            stats (SearchStats): Statistics of the run.
+        """
+        self.path = path
+        self.score = score
+        self.complete = complete
+        self.stats = stats
+
+    def __repr__(self):
+        moves = len(self.path) if self.path is not None else None
+        return f"SearchResult(moves={moves}, score={self.score}, complete={self.complete}, stats={self.stats})"
@@ -0,0 +1,217 @@
+import argparse
+import csv
+import json
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+import ai_player
+from game_board import GameBoard
+from game_controller import GameController
+from piece import PieceSequence, piece_definitions
+from presets import DIFFICULTY_PRESETS
+from search_algorithms import (AIPlayer, AStarSearch, Beam_AIPlayer, BeamSearch, BFS_AIPlayer, BranchAndBoundSearch,
+                               BreadthFirstSearch, DFSearch, DF_AIPlayer, MCTS_AIPlayer, MonteCarloTreeSearch,
+                               SearchAlgorithm, UniformCostSearch)
+from solution_cache import SolutionCache
+
+AGENTS = ("random", "greedy", "bfs", "dfs", "bnb", "astar", "ucs", "beam", "mcts")
+
+RESULT_FIELDS = ["game", "seed", "agent", "rows", "cols", "fill_density", "sequence_length",
+                 "score", "outcome", "moves", "time", "nodes"]
+
+
+def create_game(game_params, seed, search_algorithm=None):
+    """
+    Builds a seeded game the same way the GUI does: a symmetric board with clear edges and a random sequence.
+
+    Args:
+        game_params (dict): rows, cols, fill_density and sequence_length, as in DIFFICULTY_PRESETS.
+        seed (int): Seed for the board and the piece sequence.
+        search_algorithm (SearchAlgorithm, optional): Algorithm handed to the GameController.
+
+    Returns:
+        GameController: The controller of the new game.
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+    game_board = GameBoard(game_params["rows"], game_params["cols"])
+    game_board.initialize_board_state(
+        fill_density=game_params["fill_density"], symmetric=True, edge_clear=True, sigma=1
+    )
+    piece_sequence = PieceSequence(piece_definitions, sequence_length=game_params["sequence_length"])
+    return GameController(game_board, piece_sequence, search_algorithm)
+
+
+def create_player(agent, game_controller, time_limit=None, solution_cache=None):
+    """
+    Creates the player for an agent name from AGENTS.
+
+    Args:
+        agent (str): The agent name.
+        game_controller (GameController): The game the player plays.
+        time_limit (float, optional): Time limit for each search of the search-based agents.
+        solution_cache (SolutionCache, optional): Cache of plans consulted by the search-based agents.
+    """
+    searches = { # agent -> (player class, search algorithm class)
+        "bfs": (BFS_AIPlayer, BreadthFirstSearch),
+        "dfs": (DF_AIPlayer, DFSearch),
+        "bnb": (DF_AIPlayer, BranchAndBoundSearch),
+        "astar": (BFS_AIPlayer, AStarSearch),
+        "ucs": (BFS_AIPlayer, UniformCostSearch),
+        "beam": (Beam_AIPlayer, BeamSearch),
+        "mcts": (MCTS_AIPlayer, MonteCarloTreeSearch),
+    }
+    if agent == "random":
+        return AIPlayer(game_controller)
+    if agent == "greedy":
+        return ai_player.AIPlayer(game_controller)
+    if agent in searches:
+        player_class, search_class = searches[agent]
+        return player_class(game_controller, search_class(time_limit=time_limit), solution_cache=solution_cache)
+    raise ValueError(f"Unknown agent: {agent}")
+
+
+def play_game(game_params, seed, agent, time_limit=None, game=0, solution_cache_path=None):
+    """
+    Plays one game headlessly until victory or defeat, or until the agent finds no move to play ("no_plan").
+
+    Args:
+        solution_cache_path (str, optional): SQLite file of a SolutionCache shared by the search-based agents.
+
+    Returns:
+        dict: One result row with the fields in RESULT_FIELDS.
+    """
+    solution_cache = SolutionCache(solution_cache_path) if solution_cache_path else None
+    game_controller = create_game(game_params, seed)
+    player = create_player(agent, game_controller, time_limit, solution_cache)
+    search_algorithm = getattr(player, "search_algorithm", None)
+    if not isinstance(search_algorithm, SearchAlgorithm):
+        search_algorithm = None # The greedy player names its strategy with a string
+
+    moves = 0
+    nodes = 0
+    last_result = None
+    start_time = time.perf_counter()
+    while game_controller.is_game_over() is None:
+        played = player.play_step()
+        if search_algorithm is not None and search_algorithm.last_result is not last_result:
+            last_result = search_algorithm.last_result # A new search ran for this move, even a failed one
+            nodes += last_result.stats.nodes_expanded
+        if played is None:
+            break
+        moves += 1
+    elapsed = time.perf_counter() - start_time
+    if solution_cache is not None:
+        solution_cache.close()
+
+    return {
+        "game": game,
+        "seed": seed,
+        "agent": agent,
+        "rows": game_params["rows"],
+        "cols": game_params["cols"],
+        "fill_density": game_params["fill_density"],
+        "sequence_length": game_params["sequence_length"],
+        "score": game_controller.score,
+        "outcome": game_controller.is_game_over() or "no_plan", # The agent gave up with legal moves left
+        "moves": moves,
+        "time": round(elapsed, 6),
+        "nodes": nodes,
+    }
+
+
+def run_batch(games, agent, game_params, seed=0, workers=1, time_limit=None, solution_cache_path=None):
+    """
+    Plays `games` seeded games and yields each result as soon as its game finishes.
+
+    Game i uses seed + i, so a batch is reproducible whatever the number of workers; with several workers
+    the results arrive in completion order.
+
+    Args:
+        games (int): Number of games to play.
+        agent (str): Agent name from AGENTS.
+        game_params (dict): rows, cols, fill_density and sequence_length.
+        seed (int): Seed of the first game.
+        workers (int): Worker processes; 1 plays the games in this process.
+        time_limit (float, optional): Time limit for each search of the search-based agents.
+        solution_cache_path (str, optional): SQLite file of a SolutionCache shared by every game and worker.
+    """
+    if agent not in AGENTS:
+        raise ValueError(f"Unknown agent: {agent}")
+    if workers <= 1:
+        for game in range(games):
+            yield play_game(game_params, seed + game, agent, time_limit, game, solution_cache_path)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(play_game, game_params, seed + game, agent, time_limit, game,
+                                   solution_cache_path) for game in range(games)]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def write_results(results, output, output_format):
+    """
+    Streams result rows to a file object as CSV or JSONL, flushing after every row.
+
+    Returns:
+        list: The rows written.
+    """
+    rows = []
+    writer = None
+    if output_format == "csv":
+        writer = csv.DictWriter(output, fieldnames=RESULT_FIELDS)
+        writer.writeheader()
+    for result in results:
+        if writer is not None:
+            writer.writerow(result)
+        else:
+            output.write(json.dumps(result) + "\n")
+        output.flush()
+        rows.append(result)
+    return rows
+
+
+def main(argv=None):
+    """Command line entry point of the headless runner."""
+    parser = argparse.ArgumentParser(description="Play seeded Wood Block Puzzle games without the GUI.")
+    parser.add_argument("--agent", choices=AGENTS, default="greedy", help="Agent that plays the games.")
+    parser.add_argument("--games", type=int, default=10, help="Number of games to play.")
+    parser.add_argument("--difficulty", choices=list(DIFFICULTY_PRESETS), default="Intermediate",
+                        help="Difficulty preset; the options below override its values.")
+    parser.add_argument("--rows", type=int, help="Number of board rows.")
+    parser.add_argument("--cols", type=int, help="Number of board columns.")
+    parser.add_argument("--fill-density", type=float, help="Initial fill density of the board.")
+    parser.add_argument("--sequence-length", type=int, help="Number of pieces to place.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first game; game i uses seed + i.")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes.")
+    parser.add_argument("--time-limit", type=float, help="Seconds allowed per search for search-based agents.")
+    parser.add_argument("--solution-cache", help="SQLite file caching the plans of the search-based agents "
+                                                 "between runs.")
+    parser.add_argument("--output", help="Output file (default: standard output).")
+    parser.add_argument("--format", choices=("jsonl", "csv"), default="jsonl", help="Output format.")
+    args = parser.parse_args(argv)
+
+    game_params = dict(DIFFICULTY_PRESETS[args.difficulty])
+    for key in ("rows", "cols", "fill_density", "sequence_length"):
+        if getattr(args, key) is not None:
+            game_params[key] = getattr(args, key)
+
+    results = run_batch(args.games, args.agent, game_params, args.seed, args.workers, args.time_limit,
+                        args.solution_cache)
+    if args.output:
+        with open(args.output, "w", newline="") as output:
+            rows = write_results(results, output, args.format)
+    else:
+        rows = write_results(results, sys.stdout, args.format)
+
+    victories = sum(1 for row in rows if row["outcome"] == "victory")
+    mean_score = sum(row["score"] for row in rows) / len(rows) if rows else 0
+    print(f"{len(rows)} games, {victories} victories, mean score {mean_score:.1f}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+import json
+import sqlite3
+import time
+
+from piece import Piece, make_piece
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS solutions (
+    hash INTEGER NOT NULL,
+    pieces TEXT NOT NULL,
+    solver TEXT NOT NULL,
+    optimal INTEGER NOT NULL,
+    board TEXT NOT NULL,
+    plan TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (hash, pieces, solver)
+);
+CREATE INDEX IF NOT EXISTS solutions_last_used ON solutions (last_used);
+"""
+
+
+def _signed(value):
+    """Maps an unsigned 64-bit hash onto SQLite's signed 64-bit integers."""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+class SolutionCache:
+    """
+    Persistent store of the best complete plan found for each position, kept in an SQLite file.
+
+    A position is keyed by its Zobrist hash (reproducible between runs) and the ids of the pieces still to place,
+    and the exact board is stored alongside, so a hash collision is never mistaken for a hit. Each plan also
+    records the solver (SearchAlgorithm.solver) that found it and whether that solver is optimal: an optimal
+    plan is served to every solver, any other plan only to the solver that found it, so agents sharing a file
+    still play their own plans. A position keeps one plan per solver, replaced only by a higher-scoring one.
+    Once the cache holds more than max_entries plans, the least recently used ones are evicted. Several
+    processes may share one file.
+    """
+
+    def __init__(self, path, max_entries=100_000):
+        """
+        Opens (or creates) the cache file.
+
+        Args:
+            path (str): Path of the SQLite file; ":memory:" keeps the cache in this process only.
+            max_entries (int): Maximum number of stored plans.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # Players may search on a worker thread (see the GUI); calls are never concurrent within one cache
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL") # Readers do not block the writer
+        self._connection.execute("PRAGMA synchronous=NORMAL") # A crash may lose the latest plans, never corrupt
+        columns = [row[1] for row in self._connection.execute("PRAGMA table_info(solutions)")]
+        if columns and "solver" not in columns: # Written before plans recorded their solver: unusable
+            with self._connection:
+                self._connection.execute("DROP TABLE solutions")
+        self._connection.executescript(SCHEMA)
+
+    @staticmethod
+    def position_key(game_state):
+        """Returns the (hash, pieces, board) columns identifying the position of a GameState."""
+        piece_ids = [piece.id if type(piece) is Piece else make_piece(name, piece).id
+                     for name, piece in game_state.remaining_pieces]
+        bitboard = game_state.bitboard
+        board = f"{bitboard.rows}x{bitboard.cols}:{bitboard.filled:x}:{bitboard.diamonds:x}"
+        return _signed(game_state.zobrist_hash), ",".join(map(str, piece_ids)), board
+
+    def get(self, game_state, solver):
+        """
+        Looks up a plan for the position of game_state that satisfies the solver: an optimal plan, or one the
+        solver found itself.
+
+        Returns:
+            tuple: (plan, score) with the plan as a list of (piece_name, row, col) moves, or None on a miss.
+        """
+        key, pieces, board = self.position_key(game_state)
+        row = self._connection.execute(
+            "SELECT solver, board, plan, score FROM solutions WHERE hash = ? AND pieces = ? AND board = ? "
+            "AND (optimal OR solver = ?) ORDER BY optimal DESC, score DESC LIMIT 1",
+            (key, pieces, board, solver)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        with self._connection:
+            self._connection.execute("UPDATE solutions SET last_used = ? WHERE hash = ? AND pieces = ? AND solver = ?",
+                                     (time.time(), key, pieces, row[0]))
+        return [tuple(move) for move in json.loads(row[2])], row[3]
+
+    def put(self, game_state, plan, score, solver, optimal=False):
+        """
+        Stores a complete plan for the position of game_state, unless the solver already stored a plan scoring
+        at least as much.
+
+        Args:
+            solver (str): Name of the search that found the plan.
+            optimal (bool): The plan is the highest-scoring one, found by an exhaustive search within its budget.
+
+        Returns:
+            bool: True if the plan was stored.
+        """
+        key, pieces, board = self.position_key(game_state)
+        with self._connection:
+            cursor = self._connection.execute(
+                "INSERT INTO solutions (hash, pieces, solver, optimal, board, plan, score, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (hash, pieces, solver) DO UPDATE SET optimal = excluded.optimal, board = excluded.board, "
+                "plan = excluded.plan, score = excluded.score, last_used = excluded.last_used "
+                "WHERE excluded.score > solutions.score OR excluded.board != solutions.board",
+                (key, pieces, solver, int(optimal), board, json.dumps([list(move) for move in plan]), score,
+                 time.time()))
+            if cursor.rowcount:
+                self._evict()
+        return cursor.rowcount > 0
+
+    def _evict(self):
+        """Deletes the least recently used plans beyond max_entries."""
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            self._connection.execute(
+                "DELETE FROM solutions WHERE rowid IN (SELECT rowid FROM solutions ORDER BY last_used LIMIT ?)",
+                (excess,))
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+
+    def clear(self):
+        """Deletes every stored plan."""
+        with self._connection:
+            self._connection.execute("DELETE FROM solutions")
+
+    def close(self):
+        """Closes the cache file."""
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def find_plan(search_algorithm, game_state, solution_cache=None):
+    """
+    Returns the plan for game_state from the solution cache if it holds one the search would accept (see
+    SolutionCache.get()), or runs the search otherwise.
+
+    A complete plan is stored in the cache only if the search finished within its budget. Partial plans, and
+    plans found by a search its time or node limit cut short, are not, since a longer search could improve them.
+    """
+    solver = getattr(search_algorithm, "solver", type(search_algorithm).__name__)
+    if solution_cache is not None:
+        cached = solution_cache.get(game_state, solver)
+        if cached is not None:
+            return cached[0]
+    solution_path = search_algorithm.search(game_state)
+    result = getattr(search_algorithm, "last_result", None)
+    if (solution_cache is not None and result is not None and result.complete and
+            not result.stats.budget_exhausted):
+        solution_cache.put(game_state, result.path, result.score, solver, getattr(search_algorithm, "optimal", False))
+    return solution_path
@@ -0,0 +1,129 @@
+import random
+from collections import namedtuple
+from functools import lru_cache
+
+# Entry flags: the stored score is exact, or only a lower/upper bound on the true value
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+
+TTEntry = namedtuple("TTEntry", ["key", "depth", "score", "flag"])
+
+
+class ZobristKeys:
+    """
+    Random 64-bit keys for Zobrist hashing of (board, piece index) positions.
+
+    A position hash is the XOR of the key of every filled cell, every diamond cell and the piece index,
+    so a move only has to XOR in the cells it changes.
+    """
+
+    def __init__(self, rows, cols, seed=None):
+        """
+        Args:
+            rows (int): The number of rows on the board.
+            cols (int): The number of columns on the board.
+            seed (int or str, optional): Seed for the key generator, so hashes are reproducible between runs.
+                Defaults to one derived from the board size, so boards of different sizes draw different keys
+                and their hashes can share a cache.
+        """
+        self._rng = random.Random(seed if seed is not None else f"zobrist:{rows}x{cols}")
+        self.filled_keys = [self._rng.getrandbits(64) for _ in range(rows * cols)]
+        self.diamond_keys = [self._rng.getrandbits(64) for _ in range(rows * cols)]
+        self.piece_keys = []
+
+    def piece_key(self, piece_index):
+        """Returns the key of a piece index, generating more keys for longer sequences on demand."""
+        while piece_index >= len(self.piece_keys):
+            self.piece_keys.append(self._rng.getrandbits(64))
+        return self.piece_keys[piece_index]
+
+    @staticmethod
+    def mask_hash(keys, mask):
+        """XORs together the keys of every set bit of the mask."""
+        h = 0
+        while mask:
+            low_bit = mask & -mask
+            h ^= keys[low_bit.bit_length() - 1]
+            mask ^= low_bit
+        return h
+
+    def hash_position(self, filled, diamonds, piece_index):
+        """Computes the full hash of a position from scratch."""
+        return (self.mask_hash(self.filled_keys, filled) ^ self.mask_hash(self.diamond_keys, diamonds) ^
+                self.piece_key(piece_index))
+
+    def move_delta(self, occupancy, diamonds, cleared, cleared_diamonds, piece_index):
+        """
+        Returns the value to XOR into a hash when a piece is placed and lines are cleared.
+
+        Cells of the piece that end up in a cleared line are set and cleared again, so they cancel out
+        in occupancy ^ cleared. The piece index moves from piece_index to piece_index - 1.
+        """
+        return (self.mask_hash(self.filled_keys, occupancy ^ cleared) ^
+                self.mask_hash(self.diamond_keys, diamonds ^ cleared_diamonds) ^
+                self.piece_key(piece_index) ^ self.piece_key(piece_index - 1))
+
+
+@lru_cache(maxsize=None)
+def get_zobrist_keys(rows, cols):
+    """Returns the shared ZobristKeys for a board size."""
+    return ZobristKeys(rows, cols)
+
+
+class TranspositionTable:
+    """
+    Fixed-size table of search results indexed by Zobrist hash.
+
+    Each hash maps to one slot (hash % size). When two positions compete for a slot the replacement
+    policy decides which one stays:
+        "always": the newest entry wins.
+        "depth": the entry with more pieces left to place (the bigger subtree) wins.
+    Memory is bounded by `size` entries however long the search runs.
+    """
+
+    def __init__(self, size=1 << 20, replacement="depth"):
+        """
+        Args:
+            size (int): Maximum number of entries.
+            replacement (str): Replacement policy, "always" or "depth".
+        """
+        if replacement not in ("always", "depth"):
+            raise ValueError(f"Unknown replacement policy: {replacement}")
+        self.size = size
+        self.replacement = replacement
+        self._slots = {}
+        self.hits = 0
+        self.misses = 0
+
+    def probe(self, key):
+        """Returns the entry stored for the hash, or None."""
+        entry = self._slots.get(key % self.size)
+        if entry is not None and entry.key == key:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return None
+
+    def store(self, key, depth, score, flag=EXACT):
+        """
+        Stores the best score (or bound) found for a position.
+
+        Args:
+            key (int): Zobrist hash of the position.
+            depth (int): Number of pieces still to place from the position.
+            score (int): Best score, or bound on it, found for the position.
+            flag (int): EXACT, LOWER_BOUND or UPPER_BOUND.
+        """
+        slot = key % self.size
+        current = self._slots.get(slot)
+        if (current is None or current.key == key or self.replacement == "always" or
+                depth >= current.depth):
+            self._slots[slot] = TTEntry(key, depth, score, flag)
+
+    def clear(self):
+        """Removes every entry and resets the hit counters."""
+        self._slots.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._slots)